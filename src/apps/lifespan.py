@@ -0,0 +1,59 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI
+
+from apps.users.tasks import run_session_purger
+from core.db_config import db_settings
+from core.env import ADMIN_SESSION_PURGE_INTERVAL, ADMIN_SESSION_TTL
+from db import db_conn
+from helpers.logging import logger
+from repositories.user_repository import UserRepository, UserSessionRepository
+
+
+async def warm_up_statements():
+    """
+    Execute the statements used by every admin request once, so their compiled forms are cached before the first
+    request arrives. The lookups use keys that match no rows.
+    """
+    async with db_conn.async_session_manager() as session:
+        user_repo = UserRepository(session)
+        user_session_repo = UserSessionRepository(session)
+        await user_repo.get(0)
+        await user_repo.get_by_username("")
+        await user_session_repo.get_session_by_token(uuid.UUID(int=0))
+        await user_session_repo.get_session_by_token(uuid.UUID(int=0), max_age=ADMIN_SESSION_TTL)
+        await session.rollback()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    connections = await db_conn.warm_up(db_settings.db_pool_warmup)
+    if db_settings.db_warmup_statements:
+        await warm_up_statements()
+    warm_up_time = time.perf_counter() - started
+
+    tasks = []
+    if ADMIN_SESSION_PURGE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(run_session_purger(ADMIN_SESSION_PURGE_INTERVAL)))
+    if db_conn.replica_urls:
+        tasks.append(asyncio.create_task(db_conn.run_replica_health_checks()))
+
+    startup = app.state.startup
+    logger.info(
+        f"Startup: imports {startup['imports'] * 1000:.0f} ms ({startup['modules']} modules), "
+        f"app {startup['build'] * 1000:.0f} ms, warm-up {warm_up_time * 1000:.0f} ms ({connections} connections), "
+        f"ready {(time.perf_counter() - startup['started']) * 1000:.0f} ms after import"
+    )
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await db_conn.dispose()
+        logger.info("Database connections closed")
@@ -1,23 +1,50 @@
+import sys
+import time
+
+_import_started = time.perf_counter()
+_modules_before = len(sys.modules)
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from db import db_conn
 from helpers.logging import logger
+from helpers.middleware import QueryStatsMiddleware
 from .initializer import init
+from .lifespan import lifespan
 from apps.change_name_app.router import router as router_data
 
-app = FastAPI()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["POST"],
-    allow_headers=["*"],
-)
+_import_time = time.perf_counter() - _import_started
+_imported_modules = len(sys.modules) - _modules_before
+
+
+def create_app() -> FastAPI:
+    """
+    Build the application. Run with `uvicorn apps.main:create_app --factory`.
+    """
+    started = time.perf_counter()
+    app = FastAPI(lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["POST"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(QueryStatsMiddleware)
+
+    logger.info("Starting application initialization...")
+    init(app, db_conn.engine)
+    logger.info("Initialization...")
 
-logger.info("Starting application initialization...")
-init(app, db_conn.engine)
-logger.info("Initialization...")
+    app.include_router(router_data)
 
-app.include_router(router_data)
+    app.state.startup = {
+        "started": _import_started,
+        "imports": _import_time,
+        "modules": _imported_modules,
+        "build": time.perf_counter() - started,
+    }
+    return app
@@ -0,0 +1,47 @@
+"""
+Production server entrypoint: `python -m apps.server`.
+
+Starts WEB_CONCURRENCY uvicorn worker processes running `apps.main:create_app`. Each worker builds its own engine
+on startup, with pool_size/max_overflow capped at its share of DB_CONNECTION_BUDGET. On SIGTERM/SIGINT workers stop
+accepting connections, let in-flight requests finish for up to WEB_SHUTDOWN_TIMEOUT seconds, then dispose their
+engines.
+"""
+import os
+
+import uvicorn
+
+from core.env import LOG_LEVEL, WEB_CONCURRENCY, WEB_HOST, WEB_PORT, WEB_SHUTDOWN_TIMEOUT
+
+
+def main():
+    # Workers size their connection pools from the worker count (see DataBaseSettings.pool_limits).
+    os.environ["WEB_CONCURRENCY"] = str(WEB_CONCURRENCY)
+
+    from core.db_config import db_settings
+    from helpers.logging import logger
+
+    pool_size, max_overflow = db_settings.pool_limits
+    logger.info(
+        f"Starting {WEB_CONCURRENCY} workers on {WEB_HOST}:{WEB_PORT}, "
+        f"up to {pool_size + max_overflow} connections per worker per database"
+    )
+    if db_settings.db_connection_budget and WEB_CONCURRENCY > db_settings.db_connection_budget:
+        logger.warning(
+            f"DB_CONNECTION_BUDGET={db_settings.db_connection_budget} is smaller than the number of workers, "
+            f"every worker still opens one connection"
+        )
+
+    uvicorn.run(
+        "apps.main:create_app",
+        factory=True,
+        host=WEB_HOST,
+        port=WEB_PORT,
+        workers=WEB_CONCURRENCY,
+        timeout_graceful_shutdown=WEB_SHUTDOWN_TIMEOUT,
+        log_level=LOG_LEVEL.lower(),
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
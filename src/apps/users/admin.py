@@ -1,5 +1,7 @@
 from fastapi import Request
+from sqlalchemy.orm import joinedload
 
+from crypto.password import PasswordHash
 from db.models.user import User, UserSession
 from helpers.admin.auth import check_accesses_level
 from helpers.admin.base.views import CustomModelView
@@ -10,14 +12,17 @@ class UserAdmin(CustomModelView, model=User):
     column_exclude_list = ["sessions", "password"]
     column_details_exclude_list = ["sessions"]
     form_excluded_columns = ["sessions"]
+    list_load_only = True
 
     category = "users"
 
-    async def on_model_change(self, data, model, is_created: bool):
+    async def on_model_change(self, data, model, is_created: bool, request: Request):
         password = data.get("password")
         if password == "<PasswordHash>":
             data.pop("password")
-        await super().on_model_change(data, model, is_created)
+        elif isinstance(password, str):
+            data["password"] = await PasswordHash.anew(password, User.password.type.rounds)
+        await super().on_model_change(data, model, is_created, request)
 
     def is_accessible(self, request: Request) -> bool:
         return check_accesses_level(
@@ -33,6 +38,10 @@ class UserAdmin(CustomModelView, model=User):
 class UserSessionAdmin(CustomModelView, model=UserSession):
     column_list = "__all__"
     category = "auth"
+    approximate_count = True
+    relation_loaders = {
+        "user": lambda relation: joinedload(relation).load_only(User.username, User.access_level, raiseload=True),
+    }
 
     def is_accessible(self, request: Request) -> bool:
         return check_accesses_level(
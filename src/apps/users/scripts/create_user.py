@@ -1,6 +1,7 @@
 import argparse
 import asyncio
 
+from crypto.password import PasswordHash
 from db import db_conn
 from db.models.user import User
 from helpers.logging import logger
@@ -19,18 +20,19 @@ args = parser.parse_args()
 
 async def main():
     username = args.username
+    password = await PasswordHash.anew(args.password, User.password.type.rounds)
     async with db_conn.async_session_manager() as session:
         user_repo = UserRepository(session)
         user = await user_repo.get_by_username(username)
         if user:
             await user_repo.update(
-                user.id, password=args.password.encode(), access_level=args.access_level
+                user.id, password=password, access_level=args.access_level
             )
             logger.info(f"User {username} updated! access_level: {args.access_level}")
         else:
             await user_repo.create(
                 User(
-                    password=args.password,
+                    password=password,
                     access_level=args.access_level,
                     username=username,
                 )
@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import sys
+
+from db import db_conn
+from db.models.user import User, UserSession
+from helpers.export import EXPORT_MEDIA_TYPES, encode_rows
+from helpers.logging import logger
+from repositories.base_repository import BaseRepository
+
+
+MODELS = {
+    "users": (User, ["id", "username", "access_level"]),
+    "user_sessions": (UserSession, ["token", "user_id", "created_at"]),
+}
+
+parser = argparse.ArgumentParser(description="Stream a table to CSV, NDJSON or JSON")
+parser.add_argument("table", choices=MODELS)
+parser.add_argument("-f", "--format", choices=EXPORT_MEDIA_TYPES, default="csv")
+parser.add_argument("-o", "--output", help="output file, stdout if omitted")
+parser.add_argument("-c", "--columns", nargs="+", help="columns to export, dotted paths are allowed")
+parser.add_argument("--batch-size", type=int, default=5000, help="rows fetched per round trip")
+
+args = parser.parse_args()
+
+
+async def main():
+    model, default_columns = MODELS[args.table]
+    columns = args.columns or default_columns
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    exported = 0
+
+    async def batches():
+        nonlocal exported
+        async with db_conn.async_session_manager() as session:
+            async for batch in BaseRepository(model, session).stream(
+                order_by=list(model.__table__.primary_key), batch_size=args.batch_size, batches=True
+            ):
+                yield batch
+                exported += len(batch)
+
+    try:
+        async for chunk in encode_rows(batches(), columns, args.format):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    logger.info(f"Exported {exported} rows from {args.table}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
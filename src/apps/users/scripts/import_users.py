@@ -0,0 +1,218 @@
+"""
+Create or update users in bulk from a CSV (username,password[,access_level] header) or JSON lines file.
+
+    python apps/users/scripts/import_users.py users.csv --batch-size 1000
+
+Passwords are hashed on a process pool, one worker per core by default, and each batch is written with a single
+INSERT ... ON CONFLICT (username) DO UPDATE. After every committed batch the input line is saved to a checkpoint
+file, so an interrupted import started again with the same arguments continues after the last committed batch.
+Rows that cannot be imported are written to an error report (JSON lines) and do not stop the import.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from sqlalchemy.exc import DBAPIError
+
+from crypto.password import PasswordHash
+from db import db_conn
+from db.models.user import User
+from helpers.admin.enums import AccessLevel
+from helpers.logging import logger
+from repositories.user_repository import UserRepository
+
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("path", type=Path, help="CSV or JSON lines file")
+parser.add_argument("--format", choices=("csv", "jsonl"), help="input format, guessed from the file extension if omitted")
+parser.add_argument("--batch-size", type=int, default=1000, help="users written per statement")
+parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="password hashing processes")
+parser.add_argument("--checkpoint", type=Path, help="resume state, defaults to <path>.checkpoint")
+parser.add_argument("--errors", type=Path, help="error report, defaults to <path>.errors.jsonl")
+parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and import the whole file again")
+
+args = parser.parse_args()
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(path: Path, file_format: str) -> Iterator[tuple[int, dict]]:
+    """
+    Yield (line number, record) pairs from the input file.
+    """
+    with path.open(newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as ex:
+                yield line_number, RowError(f"invalid JSON: {ex}")
+
+
+def parse_row(record: dict) -> dict:
+    """
+    Validate an input record and return the user's columns it supplies, with the password still in plain text.
+    """
+    if isinstance(record, RowError):
+        raise record
+    if not isinstance(record, dict):
+        raise RowError("expected an object with username and password")
+    username = str(record.get("username") or "").strip()
+    password = record.get("password")
+    if not username:
+        raise RowError("username is required")
+    if len(username) > 50:
+        raise RowError("username is longer than 50 characters")
+    if not password:
+        raise RowError("password is required")
+
+    user = {"username": username, "password": str(password)}
+    access_level = record.get("access_level")
+    # Without an access_level an existing user keeps theirs; it is not reset to NULL.
+    if access_level not in (None, ""):
+        try:
+            user["access_level"] = (
+                AccessLevel(int(access_level)) if str(access_level).isdigit() else AccessLevel[access_level]
+            )
+        except (KeyError, ValueError):
+            raise RowError(f"unknown access_level {access_level!r}")
+    return user
+
+
+class Importer:
+    def __init__(self, executor: ProcessPoolExecutor, checkpoint: Path, errors: Path):
+        self.executor = executor
+        self.checkpoint = checkpoint
+        self.errors_path = errors
+        self.imported = 0
+        self.failed = 0
+        # Errors are written together with the checkpoint, so a resumed import does not report them twice.
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def load_checkpoint(self) -> int:
+        """
+        Return the last input line of the last committed batch, or 0 to start from the beginning.
+        """
+        if not self.checkpoint.exists():
+            return 0
+        state = json.loads(self.checkpoint.read_text())
+        self.imported = state["imported"]
+        self.failed = state["failed"]
+        return state["line"]
+
+    def save_checkpoint(self, line: int):
+        temporary = self.checkpoint.with_name(self.checkpoint.name + ".tmp")
+        temporary.write_text(json.dumps({"line": line, "imported": self.imported, "failed": self.failed}))
+        os.replace(temporary, self.checkpoint)
+
+    def report(self, line: int, error: str, username: str | None = None):
+        self.errors.append({"line": line, "username": username, "error": error})
+
+    async def hash_passwords(self, users: list[dict]):
+        loop = asyncio.get_running_loop()
+        rounds = User.password.type.rounds
+        hashes = await asyncio.gather(
+            *(loop.run_in_executor(self.executor, PasswordHash._new, user["password"], rounds) for user in users)
+        )
+        for user, password_hash in zip(users, hashes):
+            user["password"] = PasswordHash(password_hash, rounds)
+
+    async def write_batch(self, batch: list[tuple[int, dict]]):
+        """
+        Upsert a batch in one statement. If the database rejects it, retry row by row to find the bad rows.
+        """
+        async with db_conn.async_session_manager() as session:
+            repository = UserRepository(session)
+            try:
+                await repository.bulk_upsert(
+                    [user for _, user in batch], ["username"], chunk_size=len(batch)
+                )
+                self.imported += len(batch)
+                return
+            except DBAPIError:
+                await session.rollback()
+
+            for line, user in batch:
+                try:
+                    await repository.bulk_upsert([user], ["username"])
+                    self.imported += 1
+                except DBAPIError as ex:
+                    await session.rollback()
+                    self.report(line, str(ex.orig), user["username"])
+
+    async def run(self, rows: Iterator[tuple[int, dict]], batch_size: int, resume_after: int):
+        # A resumed import adds to the report of the interrupted run.
+        with self.errors_path.open("a" if resume_after else "w", encoding="utf-8") as errors:
+            batch: dict[str, tuple[int, dict]] = {}
+            last_line = resume_after
+            for line, record in rows:
+                if line <= resume_after:
+                    continue
+                last_line = line
+                try:
+                    user = parse_row(record)
+                except RowError as ex:
+                    self.report(line, str(ex), record.get("username") if isinstance(record, dict) else None)
+                    continue
+                if user["username"] in batch:
+                    # One statement cannot update the same row twice; the later line wins.
+                    earlier_line, _ = batch[user["username"]]
+                    self.report(earlier_line, f"superseded by line {line}", user["username"])
+                batch[user["username"]] = (line, user)
+
+                if len(batch) >= batch_size:
+                    await self.flush(list(batch.values()), last_line, errors)
+                    batch = {}
+            await self.flush(list(batch.values()), last_line, errors)
+
+    async def flush(self, batch: list[tuple[int, dict]], last_line: int, errors):
+        if batch:
+            await self.hash_passwords([user for _, user in batch])
+            await self.write_batch(batch)
+        for error in self.errors:
+            errors.write(json.dumps(error) + "\n")
+        errors.flush()
+        self.failed += len(self.errors)
+        self.errors = []
+        self.save_checkpoint(last_line)
+        elapsed = time.perf_counter() - self.started
+        logger.info(
+            f"Line {last_line}: {self.imported} users imported, {self.failed} rows failed, "
+            f"{self.imported / elapsed:.1f} users/s"
+        )
+
+
+async def main():
+    file_format = args.format or ("jsonl" if args.path.suffix in (".jsonl", ".ndjson") else "csv")
+    checkpoint = args.checkpoint or args.path.with_name(args.path.name + ".checkpoint")
+    errors = args.errors or args.path.with_name(args.path.name + ".errors.jsonl")
+    if args.restart:
+        checkpoint.unlink(missing_ok=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        importer = Importer(executor, checkpoint, errors)
+        resume_after = importer.load_checkpoint()
+        if resume_after:
+            logger.info(f"Resuming after line {resume_after}")
+        await importer.run(read_rows(args.path, file_format), args.batch_size, resume_after)
+
+    logger.info(f"Done: {importer.imported} users imported, {importer.failed} rows failed, see {errors} for errors")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+import argparse
+import asyncio
+
+from apps.users.tasks import purge_expired_sessions
+from core.env import ADMIN_SESSION_PURGE_BATCH_SIZE, ADMIN_SESSION_TTL
+from helpers.logging import logger
+
+
+parser = argparse.ArgumentParser(description="Delete expired admin sessions")
+parser.add_argument(
+    "--max-age", type=float, default=ADMIN_SESSION_TTL, help="session lifetime in seconds"
+)
+parser.add_argument(
+    "--batch-size", type=int, default=ADMIN_SESSION_PURGE_BATCH_SIZE, help="rows deleted per transaction"
+)
+parser.add_argument(
+    "--max-batches", type=int, help="stop after this many batches, all expired sessions are deleted if omitted"
+)
+
+args = parser.parse_args()
+
+
+async def main():
+    deleted = await purge_expired_sessions(args.max_age, args.batch_size, args.max_batches)
+    logger.info(f"{deleted} expired sessions deleted")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Optional
+
+from core.env import ADMIN_SESSION_PURGE_BATCH_SIZE, ADMIN_SESSION_PURGE_INTERVAL, ADMIN_SESSION_TTL
+from db import db_conn
+from db.retry import run_with_retry
+from helpers.logging import logger
+from repositories.user_repository import UserSessionRepository
+
+
+async def purge_expired_sessions(
+    max_age: float = ADMIN_SESSION_TTL,
+    batch_size: int = ADMIN_SESSION_PURGE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Delete expired admin sessions in batches and return how many were deleted.
+    """
+    async def purge():
+        async with db_conn.async_session_manager() as session:
+            return await UserSessionRepository(session).purge_expired(
+                max_age, batch_size=batch_size, max_batches=max_batches
+            )
+
+    # Batches already committed stay deleted; a retry starts a new batch after a deadlock.
+    deleted = await run_with_retry(purge, name="purge_expired_sessions")
+    if deleted:
+        logger.info(f"Purged {deleted} expired admin sessions")
+    return deleted
+
+
+async def run_session_purger(interval: float = ADMIN_SESSION_PURGE_INTERVAL):
+    """
+    Purge expired sessions every 'interval' seconds until cancelled.
+    Purges running concurrently in several workers skip each other's locked rows instead of waiting on them.
+    """
+    while True:
+        try:
+            await purge_expired_sessions()
+        except Exception as ex:
+            logger.exception(ex)
+        await asyncio.sleep(interval)
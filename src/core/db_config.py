@@ -1,7 +1,9 @@
 from pathlib import Path
+from uuid import uuid4
 
 from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.pool import NullPool
 
 
 base_path = Path(__file__).resolve().parent.parent
@@ -18,11 +20,80 @@ class DataBaseSettings(BaseSettings):
     db_name: str = Field(alias="POSTGRES_NAME")
     db_user: str = Field(alias="POSTGRES_USER")
     db_pass: str = Field(alias="POSTGRES_PASSWORD")
+    # Comma separated "host" or "host:port" list of streaming replicas that serve plain reads.
+    db_replica_hosts: str = Field("", alias="POSTGRES_REPLICA_HOSTS")
+
+    db_pool_size: int = Field(5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(1800, alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(True, alias="DB_POOL_PRE_PING")
+    db_statement_cache_size: int = Field(100, alias="DB_STATEMENT_CACHE_SIZE")
+    # PgBouncer in transaction mode: no client-side pool and no named prepared statement reuse.
+    db_pgbouncer: bool = Field(False, alias="DB_PGBOUNCER")
+    db_health_check_interval: float = Field(5, alias="DB_HEALTH_CHECK_INTERVAL")
+    # Sessions one DataAsyncProvider.gather() call may use at the same time.
+    db_gather_concurrency: int = Field(4, alias="DB_GATHER_CONCURRENCY")
+    # Connections all worker processes of this server may hold to each database together, 0 for no limit.
+    # Every worker caps pool_size + max_overflow at its share of the budget.
+    db_connection_budget: int = Field(0, alias="DB_CONNECTION_BUDGET")
+    db_workers: int = Field(1, alias="WEB_CONCURRENCY")
+    # Connections opened at startup so the first requests don't pay for connecting.
+    db_pool_warmup: int = Field(2, alias="DB_POOL_WARMUP")
+    # Execute the hot repository statements once at startup to fill the compiled statement cache.
+    db_warmup_statements: bool = Field(True, alias="DB_WARMUP_STATEMENTS")
 
     @computed_field
     @property
     def db_url(self) -> str:
         return f"postgresql+asyncpg://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    @computed_field
+    @property
+    def db_replica_urls(self) -> list[str]:
+        urls = []
+        for replica in filter(None, (host.strip() for host in self.db_replica_hosts.split(","))):
+            host, _, port = replica.partition(":")
+            urls.append(
+                f"postgresql+asyncpg://{self.db_user}:{self.db_pass}@{host}:{port or self.db_port}/{self.db_name}"
+            )
+        return urls
+
+    @property
+    def pool_limits(self) -> tuple[int, int]:
+        """
+        pool_size and max_overflow for one worker, reduced to fit its share of the connection budget.
+        """
+        pool_size, max_overflow = self.db_pool_size, self.db_max_overflow
+        if self.db_connection_budget > 0:
+            share = max(1, self.db_connection_budget // max(1, self.db_workers))
+            pool_size = min(pool_size, share)
+            max_overflow = min(max_overflow, share - pool_size)
+        return pool_size, max_overflow
+
+    @property
+    def engine_options(self) -> dict:
+        if self.db_pgbouncer:
+            return {
+                "poolclass": NullPool,
+                "connect_args": {
+                    "statement_cache_size": 0,
+                    "prepared_statement_cache_size": 0,
+                    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+                },
+            }
+        pool_size, max_overflow = self.pool_limits
+        return {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": self.db_pool_timeout,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+            "connect_args": {
+                "statement_cache_size": self.db_statement_cache_size,
+                "prepared_statement_cache_size": self.db_statement_cache_size,
+            },
+        }
+
 
 db_settings = DataBaseSettings()
@@ -13,3 +13,41 @@ LOG_FORMAT = os.getenv(
 )
 
 ADMIN_SECRET_KEY = os.environ.get("ADMIN_SECRET_KEY")
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+ADMIN_SESSION_CACHE_SIZE = int(os.environ.get("ADMIN_SESSION_CACHE_SIZE", 10000))
+ADMIN_SESSION_CACHE_TTL = float(os.environ.get("ADMIN_SESSION_CACHE_TTL", 30))
+ADMIN_SESSION_CACHE_NEGATIVE_TTL = float(os.environ.get("ADMIN_SESSION_CACHE_NEGATIVE_TTL", 5))
+
+DB_INSTRUMENTATION = os.environ.get("DB_INSTRUMENTATION", "true").lower() in ("1", "true", "yes")
+DB_SLOW_QUERY_THRESHOLD = float(os.environ.get("DB_SLOW_QUERY_THRESHOLD", 0.5))
+DB_N_PLUS_ONE_THRESHOLD = int(os.environ.get("DB_N_PLUS_ONE_THRESHOLD", 10))
+
+# Force a JSON codec (orjson, msgspec or json); the fastest installed one is used by default.
+JSON_CODEC = os.environ.get("JSON_CODEC") or None
+
+# Admin sessions expire ADMIN_SESSION_TTL seconds after creation, or after the last renewal with sliding renewal on.
+ADMIN_SESSION_TTL = float(os.environ.get("ADMIN_SESSION_TTL", 12 * 60 * 60))
+ADMIN_SESSION_SLIDING = os.environ.get("ADMIN_SESSION_SLIDING", "false").lower() in ("1", "true", "yes")
+# Seconds between background purges of expired sessions, 0 disables the purge task.
+ADMIN_SESSION_PURGE_INTERVAL = float(os.environ.get("ADMIN_SESSION_PURGE_INTERVAL", 10 * 60))
+ADMIN_SESSION_PURGE_BATCH_SIZE = int(os.environ.get("ADMIN_SESSION_PURGE_BATCH_SIZE", 1000))
+
+# Production server (python -m apps.server): worker processes, one per CPU by default, and the time in seconds
+# in-flight requests get to finish on shutdown.
+WEB_HOST = os.environ.get("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.environ.get("WEB_PORT", 8000))
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+WEB_SHUTDOWN_TIMEOUT = float(os.environ.get("WEB_SHUTDOWN_TIMEOUT", 30))
+
+# Repository result cache (see repositories.result_cache), shared by repositories created with a cache_ttl.
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", 10000))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Retries of transactions that fail with a deadlock, serialization failure or lock timeout (see db.retry).
+DB_RETRY_ATTEMPTS = int(os.environ.get("DB_RETRY_ATTEMPTS", 3))
+DB_RETRY_BASE_DELAY = float(os.environ.get("DB_RETRY_BASE_DELAY", 0.05))
+DB_RETRY_MAX_DELAY = float(os.environ.get("DB_RETRY_MAX_DELAY", 1))
+# Retries allowed per call, process-wide, once the initial allowance is spent.
+DB_RETRY_BUDGET_RATIO = float(os.environ.get("DB_RETRY_BUDGET_RATIO", 0.1))
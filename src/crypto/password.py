@@ -1,6 +1,61 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 from sqlalchemy.ext.mutable import Mutable
 
+from core.env import PASSWORD_HASH_WORKERS
+
+
+class HashingExecutor:
+    """
+    Runs bcrypt work on a bounded thread pool so it does not block the event loop.
+    At most 'max_workers' jobs are handed to the pool; further callers wait their turn on a semaphore.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.waiting = 0
+        self.running = 0
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+    async def run(self, func, *args):
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+            elapsed = time.perf_counter() - started
+            self.calls += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.waiting,
+            "running": self.running,
+            "calls": self.calls,
+            "avg_latency": self.total_time / self.calls if self.calls else 0.0,
+            "max_latency": self.max_time,
+        }
+
+
+hashing_executor = HashingExecutor(PASSWORD_HASH_WORKERS)
+
 
 class PasswordHash(Mutable):
     def __init__(self, hash_: str, rounds: int = 12):
@@ -20,13 +75,28 @@ class PasswordHash(Mutable):
 
     @classmethod
     def new(cls, password: str, rounds: int | None = None):
-        """Returns a new PasswordHash object for the given password and rounds."""
-        return cls(cls._new(password, rounds))
+        """Returns a new PasswordHash object for the given password and rounds (bcrypt's default if None)."""
+        hash_ = cls._new(password, rounds)
+        return cls(hash_, rounds) if rounds else cls(hash_)
+
+    @classmethod
+    async def anew(cls, password: str, rounds: int | None = None):
+        """Like `new`, but hashes on the hashing executor instead of the event loop."""
+        hash_ = await hashing_executor.run(cls._new, password, rounds)
+        return cls(hash_, rounds) if rounds else cls(hash_)
+
+    def verify(self, password: str) -> bool:
+        """Checks the given password against the stored hash."""
+        return bcrypt.checkpw(password.encode(), self.hash.encode())
+
+    async def averify(self, password: str) -> bool:
+        """Like `verify`, but checks on the hashing executor instead of the event loop."""
+        return await hashing_executor.run(self.verify, password)
 
     @staticmethod
     def _new(password: str, rounds: int | None = None):
         """Returns a new crypt hash for the given password and rounds."""
-        salt = bcrypt.gensalt(rounds)
+        salt = bcrypt.gensalt(rounds) if rounds else bcrypt.gensalt()
         hashed = bcrypt.hashpw(password.encode(), salt)
         return hashed.decode()
 
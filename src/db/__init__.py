@@ -1,6 +1,21 @@
 from core.db_config import db_settings
+from core.env import DB_INSTRUMENTATION, DB_N_PLUS_ONE_THRESHOLD, DB_SLOW_QUERY_THRESHOLD
+from .instrumentation import QueryInstrumentation
 from .models.user import *
 from .providers import DataAsyncProvider
 
 
-db_conn = DataAsyncProvider(db_settings.db_url)
+db_conn = DataAsyncProvider(
+    db_settings.db_url,
+    replica_urls=db_settings.db_replica_urls,
+    health_check_interval=db_settings.db_health_check_interval,
+    gather_concurrency=db_settings.db_gather_concurrency,
+    **db_settings.engine_options,
+)
+if DB_INSTRUMENTATION:
+    db_conn.instrument(
+        QueryInstrumentation(
+            slow_query_threshold=DB_SLOW_QUERY_THRESHOLD,
+            n_plus_one_threshold=DB_N_PLUS_ONE_THRESHOLD,
+        )
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN of another statement. Parameters are rendered inline so the plan uses the actual values;
+    compiling fails with CompileError for values that have no literal form.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement, format_: str = "JSON"):
+        self.statement = statement
+        self.format = format_
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw):
+    return f"EXPLAIN (FORMAT {element.format}) {compiler.process(element.statement, literal_binds=True, **kw)}"
@@ -0,0 +1,121 @@
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from helpers.logging import logger
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements executed within one tracked scope, usually one HTTP request.
+    """
+
+    queries: int = 0
+    total_time: float = 0.0
+    rows: int = 0
+    retries: int = 0
+    shapes: Counter = field(default_factory=Counter)
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collect statistics of every statement executed in the current context until exit.
+    """
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats.reset(token)
+
+
+def _calling_repository() -> Optional[str]:
+    """
+    Name the repository method that issued the current statement, e.g. "UserRepository.get_by_username".
+    Private helpers (`_fetch_all`, `_commit`, ...) are skipped in favour of the public method that called them.
+    The statement runs in a greenlet spawned by the async session, so the search continues in the parent greenlet.
+    """
+    private = None
+    frame = sys._getframe(2)
+    current = getcurrent()
+    while True:
+        while frame is not None:
+            if frame.f_globals.get("__name__", "").startswith("repositories."):
+                owner = frame.f_locals.get("self")
+                if owner is not None:
+                    name = f"{type(owner).__name__}.{frame.f_code.co_name}"
+                    if not frame.f_code.co_name.startswith("_"):
+                        return name
+                    private = private or name
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return private
+        frame = current.gr_frame
+
+
+class QueryInstrumentation:
+    """
+    Engine event hooks that time every statement, log slow ones and flag N+1 query patterns.
+    A statement is reported as a likely N+1 when the same SQL runs 'n_plus_one_threshold' times in one tracked scope.
+    """
+
+    def __init__(self, slow_query_threshold: float = 0.5, n_plus_one_threshold: int = 10):
+        self.slow_query_threshold = slow_query_threshold
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    def install(self, engine: Engine | AsyncEngine):
+        if isinstance(engine, AsyncEngine):
+            engine = engine.sync_engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @staticmethod
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time so the pooled connection
+        # does not carry it into the next checkout.
+        if exception_context.connection is not None:
+            exception_context.connection.info.pop("query_started_at", None)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        rowcount = max(cursor.rowcount, 0)
+
+        if elapsed >= self.slow_query_threshold:
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms, {rowcount} rows) "
+                f"from {_calling_repository() or 'unknown caller'}: {statement}"
+            )
+
+        stats = query_stats.get()
+        if stats is None:
+            return
+        stats.queries += 1
+        stats.total_time += elapsed
+        stats.rows += rowcount
+        stats.shapes[statement] += 1
+        if stats.shapes[statement] == self.n_plus_one_threshold:
+            logger.warning(
+                f"Possible N+1: statement executed {self.n_plus_one_threshold} times in one request "
+                f"from {_calling_repository() or 'unknown caller'}: {statement}"
+            )
@@ -0,0 +1,28 @@
+"""Reusable Alembic operations for migration scripts."""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+def text_json_to_jsonb(table_name: str, column_name: str, schema: str | None = None) -> None:
+    """Convert a Text column holding JSON (JSONEncodedDict) into native JSONB in place."""
+    op.alter_column(
+        table_name,
+        column_name,
+        type_=JSONB(),
+        existing_type=sa.Text(),
+        postgresql_using=f'"{column_name}"::jsonb',
+        schema=schema,
+    )
+
+
+def jsonb_to_text_json(table_name: str, column_name: str, schema: str | None = None) -> None:
+    """Reverse of text_json_to_jsonb, for downgrade()."""
+    op.alter_column(
+        table_name,
+        column_name,
+        type_=sa.Text(),
+        existing_type=JSONB(),
+        postgresql_using=f'"{column_name}"::text',
+        schema=schema,
+    )
@@ -0,0 +1,40 @@
+"""index_user_sessions_created_at
+
+Revision ID: 3f2a9c1d7e45
+Revises: be9893939a59
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7e45'
+down_revision: Union[str, Sequence[str], None] = 'be9893939a59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so logins and admin requests are not blocked while the index is created.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_user_sessions_created_at'),
+            'user_sessions',
+            ['created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_user_sessions_created_at'),
+            table_name='user_sessions',
+            postgresql_concurrently=True,
+        )
@@ -2,4 +2,9 @@
 from sqlalchemy.orm import declarative_base
 
 
-Base = declarative_base()
+class _EagerDefaults:
+    # Fetch server-generated column values with RETURNING during flush instead of a refresh() round trip.
+    __mapper_args__ = {"eager_defaults": True}
+
+
+Base = declarative_base(cls=_EagerDefaults)
@@ -1,20 +1,31 @@
 import uuid
+from datetime import datetime, timezone
 
-import bcrypt
-from sqlalchemy import Column, ForeignKey, String, func
+from sqlalchemy import Column, ForeignKey, String
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql.expression import select
-from sqlalchemy.sql.sqltypes import UUID, BigInteger, Enum, DateTime
+from sqlalchemy.sql.sqltypes import UUID, BigInteger, Enum, DateTime, Integer
 
 from helpers.admin.enums import AccessLevel
 from .base import Base
 from ..types.fields import Password
 
 
+def utcnow() -> datetime:
+    """
+    The current UTC time without tzinfo, as stored in naive DateTime columns.
+    Session timestamps and their expiry cutoffs all come from this clock, whatever the database's time zone is.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(BigInteger, primary_key=True, index=True, unique=True, nullable=False)
+    # SQLite only generates ids for an INTEGER primary key.
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True, unique=True, nullable=False
+    )
     username = Column(String(50), nullable=False, unique=True)
     password = Column(Password(length=156), nullable=False)
     access_level = Column(Enum(AccessLevel))
@@ -26,7 +37,10 @@ class User(Base):
         return getattr(type(self), key).type.validator(password)
 
     def verify_password(self, password):
-        return bcrypt.checkpw(password.encode(), self.password.hash.encode())
+        return self.password.verify(password)
+
+    async def averify_password(self, password):
+        return await self.password.averify(password)
 
 
 class UserSession(Base):
@@ -42,7 +56,7 @@ class UserSession(Base):
     user_id = Column(BigInteger, ForeignKey("users.id"), index=True, nullable=False)
 
     user = relationship("User", back_populates="sessions")
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False, index=True)
 
     @classmethod
     def _filter_session_by_user_id(cls, user_id: int):
@@ -0,0 +1,50 @@
+import time
+from weakref import WeakSet
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection and how old pooled connections are.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._records: WeakSet[ConnectionPoolEntry] = WeakSet()
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        record = super()._create_connection()
+        self._records.add(record)
+        return record
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        record = super()._do_get()
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return record
+
+    def stats(self) -> dict:
+        now = time.time()
+        ages = [
+            now - record.starttime
+            for record in list(self._records)
+            if record.dbapi_connection is not None
+        ]
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "avg_wait": self.total_wait / self.checkouts if self.checkouts else 0.0,
+            "max_wait": self.max_wait,
+            "max_connection_age": max(ages, default=0.0),
+            "avg_connection_age": sum(ages) / len(ages) if ages else 0.0,
+        }
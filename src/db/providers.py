@@ -1,20 +1,113 @@
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+import asyncio
+import itertools
+import os
+import time
+import weakref
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Optional, TypeVar
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.sql.expression import text
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from helpers.logging import logger
+from .pool import InstrumentedAsyncQueuePool
+from .retry import RetryPolicy, run_with_retry
+from .routing import RoutingSession, pin_primary
+from .types.json_codec import json_codec
+from .unit_of_work import UnitOfWork
+
+
+T = TypeVar("T")
+
+# Providers living in this process, reset in the child after os.fork().
+_providers = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for provider in list(_providers):
+        provider._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
 
 class DataAsyncProvider:
-    def __init__(self, db_url: str):
+    def __init__(
+        self,
+        db_url: str,
+        replica_urls: Sequence[str] = (),
+        health_check_interval: float = 5,
+        gather_concurrency: int = 4,
+        **engine_options,
+    ):
         self.url = db_url
-        self.engine = create_async_engine(self.url, echo=False, future=True)
-        self.async_session_factory = async_sessionmaker(
-            self.engine, class_=AsyncSession, expire_on_commit=False
+        self.replica_urls = list(replica_urls)
+        self.health_check_interval = health_check_interval
+        self.gather_concurrency = gather_concurrency
+        self._last_healthy_at = None
+        engine_options.setdefault("json_serializer", json_codec.dumps)
+        engine_options.setdefault("json_deserializer", json_codec.loads)
+        self.engine_options = engine_options
+        self._engine = None
+        self._replica_engines = []
+        self._healthy_replicas = []
+        self._replica_counter = itertools.count()
+        self._async_session_factory = None
+        self._instrumentations = []
+        _providers.add(self)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """
+        The primary engine. Engines are created on first use, so importing `db` does not load the driver.
+        """
+        if self._engine is None:
+            self._create_engines()
+        return self._engine
+
+    @property
+    def replica_engines(self) -> list[AsyncEngine]:
+        if self._engine is None:
+            self._create_engines()
+        return self._replica_engines
+
+    @property
+    def async_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._engine is None:
+            self._create_engines()
+        return self._async_session_factory
+
+    def _create_engines(self):
+        self._engine = self._create_engine(self.url)
+        self._replica_engines = [self._create_engine(url) for url in self.replica_urls]
+        self._healthy_replicas = list(self._replica_engines)
+        for engine in self._replica_engines:
+            event.listen(engine.sync_engine, "handle_error", self._on_replica_error)
+        for instrumentation in self._instrumentations:
+            for engine in (self._engine, *self._replica_engines):
+                instrumentation.install(engine)
+
+        session_options = {}
+        if self._replica_engines:
+            session_options = {"sync_session_class": RoutingSession, "router": self}
+        self._async_session_factory = async_sessionmaker(
+            self._engine, class_=AsyncSession, expire_on_commit=False, **session_options
         )
 
+    def _create_engine(self, url: str) -> AsyncEngine:
+        options = dict(self.engine_options)
+        if "poolclass" not in options:
+            # Only a queue pool can be swapped for the instrumented one; other defaults (StaticPool for in-memory
+            # SQLite) are kept, and pool_stats() reports their status() instead.
+            sa_url = make_url(url)
+            if issubclass(sa_url.get_dialect().get_pool_class(sa_url), AsyncAdaptedQueuePool):
+                options["poolclass"] = InstrumentedAsyncQueuePool
+        return create_async_engine(url, echo=False, future=True, **options)
+
     async def get_async_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.async_session_factory() as session:
             yield session
@@ -24,11 +117,208 @@ class DataAsyncProvider:
         async with self.async_session_factory() as session:
             yield session
 
-    async def is_connected(self) -> bool:
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncGenerator[UnitOfWork, None]:
+        """
+        Run several repository calls in one transaction, committed once when the block exits without an error:
+
+            async with db_conn.unit_of_work() as uow:
+                user = await uow.repository(UserRepository).get_by_username(username)
+                await uow.repository(UserSessionRepository).create(UserSession(user_id=user.id))
+
+        Every statement of the unit runs on the primary, including its reads, so they see committed writes.
+        """
+        async with self.async_session_factory() as session:
+            pin_primary(session.sync_session)
+            uow = UnitOfWork(session)
+            try:
+                yield uow
+                await session.commit()
+            except BaseException:
+                await session.rollback()
+                raise
+
+    async def run_transaction(
+        self,
+        func: Callable[[UnitOfWork], Awaitable[T]],
+        name: Optional[str] = None,
+        policy: Optional[RetryPolicy] = None,
+    ) -> T:
+        """
+        Run 'func' in a unit of work and commit it. After a deadlock, serialization failure or lock timeout the
+        unit is rolled back and 'func' runs again in a new one, with backoff (see db.retry):
+
+            await db_conn.run_transaction(
+                lambda uow: uow.repository(UserSessionRepository).delete_by_token(token), name="admin.logout"
+            )
+        """
+
+        async def attempt():
+            async with self.unit_of_work() as uow:
+                return await func(uow)
+
+        return await run_with_retry(attempt, name=name or getattr(func, "__qualname__", None), policy=policy)
+
+    async def gather(
+        self, *calls: Callable[[AsyncSession], Awaitable[Any]], limit: Optional[int] = None
+    ) -> list:
+        """
+        Run independent read-only calls at the same time, each on its own session and pooled connection,
+        and return their results in order:
+
+            users, total = await db_conn.gather(
+                lambda session: UserRepository(session).get_all(limit=20),
+                lambda session: UserRepository(session).count(),
+            )
+
+        At most 'limit' (default `gather_concurrency`) calls hold a connection at once. Sessions are closed
+        without committing, so returned objects are detached with the attributes they loaded. If a call fails,
+        the others are cancelled and its exception is raised.
+        """
+        semaphore = asyncio.Semaphore(limit or self.gather_concurrency)
+
+        async def run(call):
+            async with semaphore:
+                async with self.async_session_factory() as session:
+                    return await call(session)
+
+        if len(calls) == 1:
+            return [await run(calls[0])]
         try:
-            async with self.async_session_manager() as session:
-                await session.execute(text("SELECT 1"))
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(run(call)) for call in calls]
+        except BaseExceptionGroup as errors:
+            raise errors.exceptions[0]
+        return [task.result() for task in tasks]
+
+    async def is_connected(self) -> bool:
+        """
+        Check that the database answers. A successful check is reused for `health_check_interval` seconds,
+        so frequent probes don't each take a connection and a round trip.
+        """
+        now = time.monotonic()
+        if self._last_healthy_at is not None and now - self._last_healthy_at < self.health_check_interval:
             return True
+        try:
+            async with self.engine.connect() as connection:
+                await connection.exec_driver_sql("SELECT 1")
+            self._last_healthy_at = time.monotonic()
         except Exception as ex:
+            self._last_healthy_at = None
             logger.exception(ex)
             return False
+        await self.check_replicas()
+        return True
+
+    def pick_replica(self) -> Optional[AsyncEngine]:
+        """
+        Return the next healthy replica engine in round-robin order, or None to use the primary.
+        """
+        replicas = self._healthy_replicas
+        if not replicas:
+            return None
+        return replicas[next(self._replica_counter) % len(replicas)]
+
+    async def check_replicas(self) -> list[AsyncEngine]:
+        """
+        Ping every replica and route reads only to the ones that answer.
+        """
+        healthy = []
+        for engine in self.replica_engines:
+            try:
+                async with engine.connect() as connection:
+                    await connection.exec_driver_sql("SELECT 1")
+                healthy.append(engine)
+            except Exception as ex:
+                logger.warning(f"Replica {engine.url.host} is unavailable, reading from primary: {ex}")
+        self._healthy_replicas = healthy
+        return healthy
+
+    async def run_replica_health_checks(self, interval: Optional[float] = None):
+        """
+        Check the replicas every 'interval' seconds (default `health_check_interval`) until cancelled, so replicas
+        that went down stop receiving reads and ones that came back receive them again.
+        """
+        while True:
+            try:
+                await self.check_replicas()
+            except Exception as ex:
+                logger.exception(ex)
+            await asyncio.sleep(interval or self.health_check_interval)
+
+    def _on_replica_error(self, context):
+        """
+        Stop routing reads to a replica as soon as connecting to it fails or its connection drops,
+        instead of waiting for the next health check.
+        """
+        if not (context.is_disconnect or context.connection is None):
+            return
+        for engine in self._healthy_replicas:
+            if engine.sync_engine is context.engine:
+                logger.warning(f"Replica {engine.url.host} failed, reading from primary: {context.original_exception}")
+                self._healthy_replicas = [replica for replica in self._healthy_replicas if replica is not engine]
+                break
+
+    def instrument(self, instrumentation):
+        """
+        Install query instrumentation on the primary and replica engines, now or when they are created.
+        """
+        self._instrumentations.append(instrumentation)
+        if self._engine is not None:
+            for engine in (self._engine, *self._replica_engines):
+                instrumentation.install(engine)
+
+    async def warm_up(self, connections: int) -> int:
+        """
+        Open up to 'connections' pool connections to every engine at once and return them to the pool.
+        Returns the number of connections opened on the primary.
+        """
+        opened = 0
+        for engine in (self.engine, *self.replica_engines):
+            size = getattr(engine.pool, "size", None)
+            count = min(connections, size()) if callable(size) else 0
+            if count <= 0:
+                continue
+            async with AsyncExitStack() as stack:
+                await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(count)))
+            if engine is self.engine:
+                opened = count
+        return opened
+
+    async def dispose(self):
+        """
+        Close all pooled connections. The engines stay usable and reconnect on the next checkout.
+        """
+        if self._engine is None:
+            return
+        for engine in (self._engine, *self._replica_engines):
+            await engine.dispose()
+        self._last_healthy_at = None
+
+    def _after_fork(self):
+        """
+        Give a forked child its own connection pools. Connections inherited from the parent belong to the parent;
+        they are dropped without being closed so the parent's connections stay usable.
+        """
+        if self._engine is None:
+            return
+        for engine in (self._engine, *self._replica_engines):
+            engine.sync_engine.dispose(close=False)
+        self._last_healthy_at = None
+        self._healthy_replicas = list(self._replica_engines)
+
+    def pool_stats(self) -> dict:
+        """
+        Connection pool counters: checked-out/idle/overflow connections, checkout wait times and connection ages.
+        """
+        stats = self._engine_pool_stats(self.engine)
+        if self.replica_engines:
+            stats["replicas"] = [self._engine_pool_stats(engine) for engine in self.replica_engines]
+        return stats
+
+    @staticmethod
+    def _engine_pool_stats(engine: AsyncEngine) -> dict:
+        pool = engine.pool
+        if isinstance(pool, InstrumentedAsyncQueuePool):
+            return pool.stats()
+        return {"status": pool.status()}
@@ -0,0 +1,167 @@
+import asyncio
+import functools
+import random
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional, TypeVar
+
+from sqlalchemy.exc import DBAPIError
+
+from core.env import DB_RETRY_ATTEMPTS, DB_RETRY_BASE_DELAY, DB_RETRY_BUDGET_RATIO, DB_RETRY_MAX_DELAY
+from helpers.logging import logger
+from .instrumentation import query_stats
+
+
+T = TypeVar("T")
+
+# SQLSTATEs after which the whole transaction can be run again with a good chance of success.
+TRANSIENT_SQLSTATES = {
+    "40001": "serialization_failure",
+    "40P01": "deadlock_detected",
+    "55P03": "lock_not_available",
+}
+
+
+def transient_sqlstate(error: BaseException) -> Optional[str]:
+    """
+    The SQLSTATE of 'error' if it is a transient failure worth retrying, otherwise None.
+    """
+    if not isinstance(error, DBAPIError):
+        return None
+    orig = error.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    return sqlstate if sqlstate in TRANSIENT_SQLSTATES else None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retries allowed per call and the exponential backoff between them, with full jitter.
+    """
+
+    attempts: int = DB_RETRY_ATTEMPTS
+    base_delay: float = DB_RETRY_BASE_DELAY
+    max_delay: float = DB_RETRY_MAX_DELAY
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class RetryBudget:
+    """
+    Process-wide limit on retries: every call earns 'ratio' of a retry, every retry spends one.
+    Under heavy contention retries stop once the budget is spent instead of multiplying the load.
+    """
+
+    def __init__(self, ratio: float = 0.1, minimum: float = 10, maximum: float = 100):
+        self.ratio = ratio
+        self.maximum = maximum
+        self._balance = minimum
+        self._lock = Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.maximum, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class RetryStats:
+    """
+    Retry counters per operation, to find where transactions contend.
+    """
+
+    def __init__(self):
+        self._operations: dict[str, Counter] = defaultdict(Counter)
+        self._lock = Lock()
+
+    def record(self, operation: str, event: str):
+        with self._lock:
+            self._operations[operation][event] += 1
+
+    def stats(self) -> dict:
+        """
+        {operation: {"calls", "retries", "exhausted", "budget_exhausted" and a count per SQLSTATE}}.
+        """
+        with self._lock:
+            return {operation: dict(counts) for operation, counts in self._operations.items()}
+
+    def clear(self):
+        with self._lock:
+            self._operations.clear()
+
+
+retry_budget = RetryBudget(ratio=DB_RETRY_BUDGET_RATIO)
+retry_stats = RetryStats()
+
+
+async def run_with_retry(
+    func: Callable[..., Awaitable[T]],
+    *args,
+    name: Optional[str] = None,
+    policy: Optional[RetryPolicy] = None,
+    **kwargs,
+) -> T:
+    """
+    Await `func(*args, **kwargs)`, calling it again after deadlocks, serialization failures and lock timeouts.
+    'func' must be the whole transaction: it opens its own session (or unit of work) on every call, so a retry
+    replays everything the failed attempt did after it was rolled back.
+    """
+    policy = policy or RetryPolicy()
+    name = name or getattr(func, "__qualname__", repr(func))
+    retry_stats.record(name, "calls")
+    retry_budget.deposit()
+    retry = 0
+    while True:
+        try:
+            return await func(*args, **kwargs)
+        except DBAPIError as ex:
+            sqlstate = transient_sqlstate(ex)
+            if sqlstate is None:
+                raise
+            if retry >= policy.attempts:
+                retry_stats.record(name, "exhausted")
+                raise
+            if not retry_budget.withdraw():
+                retry_stats.record(name, "budget_exhausted")
+                raise
+            retry_stats.record(name, "retries")
+            retry_stats.record(name, sqlstate)
+            stats = query_stats.get()
+            if stats is not None:
+                stats.retries += 1
+
+            delay = policy.delay(retry)
+            retry += 1
+            logger.warning(
+                f"{name}: {TRANSIENT_SQLSTATES[sqlstate]} ({sqlstate}), "
+                f"retry {retry}/{policy.attempts} in {delay * 1000:.0f}ms"
+            )
+            await asyncio.sleep(delay)
+
+
+def retryable(func: Optional[Callable] = None, *, name: Optional[str] = None, policy: Optional[RetryPolicy] = None):
+    """
+    Decorate a coroutine function that runs a whole transaction so transient failures are retried:
+
+        @retryable
+        async def rename(user_id: int, username: str):
+            async with db_conn.async_session_manager() as session:
+                await UserRepository(session).update(user_id, username=username)
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_with_retry(func, *args, name=name or func.__qualname__, policy=policy, **kwargs)
+
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
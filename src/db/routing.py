@@ -0,0 +1,40 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+
+PIN_PRIMARY = "pin_primary"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain reads to a read replica and everything else to the primary.
+    Writes, flushes and locking reads use the primary, and after the first of them the session stays
+    pinned to the primary so it reads its own writes.
+    """
+
+    def __init__(self, *args, router=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = self.router.engine.sync_engine
+        if self.info.get(PIN_PRIMARY):
+            return primary
+
+        if self._flushing or not _is_plain_read(clause):
+            self.info[PIN_PRIMARY] = True
+            return primary
+
+        replica = self.router.pick_replica()
+        return replica.sync_engine if replica is not None else primary
+
+
+def _is_plain_read(clause) -> bool:
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+def pin_primary(session) -> None:
+    """
+    Route every following statement of 'session' to the primary.
+    """
+    session.info[PIN_PRIMARY] = True
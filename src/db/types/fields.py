@@ -1,13 +1,103 @@
 import json
 
-from sqlalchemy.types import TypeDecorator, Text, String
+from sqlalchemy import cast
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator, Text, String, JSON
 
 from crypto.password import PasswordHash
+from .json_codec import json_codec
+
+
+class LazyJSON:
+    """Raw JSON text that is decoded on first access."""
+
+    __slots__ = ("_raw", "_value", "_decoded")
+
+    def __init__(self, raw: str | bytes):
+        self._raw = raw
+        self._value = None
+        self._decoded = False
+
+    @property
+    def value(self):
+        if not self._decoded:
+            self._value = json_codec.loads(self._raw)
+            self._decoded = True
+            self._raw = None
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self.value, name)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __eq__(self, other):
+        if isinstance(other, LazyJSON):
+            other = other.value
+        return self.value == other
+
+    def __repr__(self):
+        return "<{}>".format(type(self).__name__)
+
+
+class _LazyJSONText(TypeDecorator):
+    """Result type of lazily loaded JSONField columns: JSON text wrapped in LazyJSON."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            return LazyJSON(value)
+        return value
+
+
+class JSONField(TypeDecorator):
+    """Native JSON column: JSONB on PostgreSQL, JSON elsewhere.
+
+    Values are encoded and decoded once, by the engine's json_serializer / json_deserializer
+    (see DataAsyncProvider, which installs the fastest available codec). With lazy=True the column
+    is selected as text and returned as a LazyJSON that is only decoded when accessed.
+    Supersedes JSONEncodedDict; see db.migration_ops for moving existing Text columns over.
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, lazy: bool = False, **kwds):
+        self.lazy = lazy
+        super(JSONField, self).__init__(**kwds)
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(JSON())
+
+    def column_expression(self, column):
+        if self.lazy:
+            return cast(column, _LazyJSONText())
+        return column
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, LazyJSON):
+            return value.value
+        return value
 
 
 class JSONEncodedDict(TypeDecorator):
 
     impl = Text
+    cache_ok = True
 
     def process_bind_param(self, value, dialect):
         if isinstance(value, dict | list | tuple):
@@ -26,6 +116,7 @@ class Password(TypeDecorator):
     """Allows storing and retrieving password hashes using PasswordHash."""
 
     impl = String
+    cache_ok = True
 
     def __init__(self, rounds=12, **kwds):
         self.rounds = rounds
@@ -0,0 +1,52 @@
+import json
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from core.env import JSON_CODEC
+
+
+class JSONCodec(NamedTuple):
+    name: str
+    dumps: Callable[[Any], str]
+    loads: Callable[[str | bytes], Any]
+
+
+def _orjson_codec() -> JSONCodec:
+    import orjson
+
+    return JSONCodec("orjson", lambda value: orjson.dumps(value).decode(), orjson.loads)
+
+
+def _msgspec_codec() -> JSONCodec:
+    import msgspec
+
+    encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+    return JSONCodec("msgspec", lambda value: encoder.encode(value).decode(), decoder.decode)
+
+
+def _stdlib_codec() -> JSONCodec:
+    encoder = json.JSONEncoder(separators=(",", ":"), default=str)
+    return JSONCodec("json", encoder.encode, json.loads)
+
+
+_CODECS = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def get_json_codec(name: str | None = None) -> JSONCodec:
+    """
+    Return the named JSON codec, or the fastest installed one: orjson, then msgspec, then the stdlib json module.
+    """
+    if name is not None:
+        return _CODECS[name]()
+    for factory in _CODECS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+
+
+json_codec = get_json_codec(JSON_CODEC)
@@ -0,0 +1,40 @@
+from collections.abc import Hashable
+from typing import Type, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+R = TypeVar("R")
+
+
+class UnitOfWork:
+    """
+    A transaction shared by several repositories.
+    Repositories obtained from `repository()` only flush their writes; everything is committed once when the
+    unit of work ends, or rolled back together if it fails.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._repositories: dict[Hashable, object] = {}
+
+    def repository(self, repository_class: Type[R], *args) -> R:
+        """
+        Return a repository bound to this unit of work's session.
+        'args' are passed before the session, e.g. `uow.repository(BaseRepository, User)`.
+        """
+        key = (repository_class, *args)
+        repository = self._repositories.get(key)
+        if repository is None:
+            repository = repository_class(*args, self.session, autocommit=False)
+            self._repositories[key] = repository
+        return repository
+
+    async def flush(self):
+        await self.session.flush()
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
@@ -1,10 +1,14 @@
 from fastapi import Request
 from sqladmin.authentication import AuthenticationBackend
 
+from core.env import ADMIN_SESSION_SLIDING, ADMIN_SESSION_TTL
 from db import db_conn
 from db.models.user import UserSession
+from db.unit_of_work import UnitOfWork
+from helpers.cache import MISSING
 from repositories.user_repository import UserRepository, UserSessionRepository
 from .enums import AccessLevel
+from .session_cache import session_cache, session_cache_key
 
 
 class AdminAuth(AuthenticationBackend):
@@ -13,43 +17,56 @@ class AdminAuth(AuthenticationBackend):
         form = await request.form()
         username, password = form["username"], form["password"]
         async with db_conn.async_session_manager() as session:
-            user_rep = UserRepository(session)
-            user = await user_rep.get_by_username(username=username)
-            if user and user.verify_password(password):
-                user_session_rep = UserSessionRepository(session)
-                user_session = await user_session_rep.create(
-                    UserSession(
-                        user_id=user.id,
-                    )
-                )
-                request.session.update(
-                    {
-                        "user_id": user_session.user_id,
-                        "token": user_session.token.hex,
-                        "access_level": user.access_level.value,
-                    }
-                )
-                return True
+            user = await UserRepository(session).get_by_username(username=username)
+        # bcrypt takes a few hundred milliseconds; check it without holding a connection or transaction open.
+        if not (user and await user.averify_password(password)):
             return False
 
+        user_session = await db_conn.run_transaction(
+            lambda uow: uow.repository(UserSessionRepository).create(UserSession(user_id=user.id)),
+            name="admin.login",
+        )
+        # Cached right away so the next request's authenticate cannot read a lagging replica and cache a miss.
+        session_cache.set(session_cache_key(user_session.token), user_session.user_id)
+        request.session.update(
+            {
+                "user_id": user_session.user_id,
+                "token": user_session.token.hex,
+                "access_level": user.access_level.value,
+            }
+        )
+        return True
+
     async def logout(self, request: Request) -> bool:
-        async with db_conn.async_session_manager() as session:
-            user_session_rep = UserSessionRepository(session)
-            await user_session_rep.delete_by_token(request.session["token"])
-            request.session.clear()
+        token = request.session["token"]
+        await db_conn.run_transaction(
+            lambda uow: uow.repository(UserSessionRepository).delete_by_token(token), name="admin.logout"
+        )
+        # Evicted only once the delete is committed; earlier, a concurrent request could cache the session again.
+        session_cache.pop(session_cache_key(token))
+        request.session.clear()
         return True
 
     async def authenticate(self, request: Request) -> bool:
         token = request.session.get("token")
-        if token:
-            async with db_conn.async_session_manager() as session:
-                user_session_rep = UserSessionRepository(session)
-                session = await user_session_rep.get_session_by_token(token)
-                if session and session.user_id != request.session["user_id"]:
-                    session = None
-        else:
-            session = None
-        return bool(session)
+        if not token:
+            return False
+
+        async def check_session(uow: UnitOfWork):
+            user_session_rep = uow.repository(UserSessionRepository)
+            user_session = await user_session_rep.get_session_by_token(token, max_age=ADMIN_SESSION_TTL)
+            if user_session and ADMIN_SESSION_SLIDING:
+                await user_session_rep.renew(token, older_than=ADMIN_SESSION_TTL / 2)
+            return user_session
+
+        cache_key = session_cache_key(token)
+        user_id = session_cache.get(cache_key)
+        if user_id is MISSING:
+            user_session = await db_conn.run_transaction(check_session, name="admin.authenticate")
+            user_id = user_session.user_id if user_session else None
+            session_cache.set(cache_key, user_id)
+
+        return user_id is not None and user_id == request.session.get("user_id")
 
 
 def check_accesses_level(
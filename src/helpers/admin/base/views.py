@@ -1,11 +1,50 @@
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any, ClassVar
+
 from fastapi import Request
 from sqladmin import ModelView
+from sqladmin.helpers import secure_filename
+from sqlalchemy import Select
+from sqlalchemy.orm import load_only, raiseload, selectinload
+from starlette.responses import Response, StreamingResponse
 
 from helpers.admin.auth import check_accesses_level
+from helpers.export import EXPORT_MEDIA_TYPES, encode_rows
+from repositories.base_repository import BaseRepository
 from ..enums import AccessLevel
 
 
+# Query parameters of a list page that do not narrow down the listed rows.
+_UNFILTERED_LIST_PARAMS = {"page", "pageSize", "sortBy", "sort"}
+
+
 class CustomModelView(ModelView):
+    # Use planner estimates for the row count of unfiltered list pages (see BaseRepository.count).
+    approximate_count: bool = False
+    # Loader strategy per relationship name for list, details and export queries, e.g. {"user": joinedload}.
+    # Each value is called with the relationship attribute and returns a loader option.
+    # Relationships without an entry are loaded with sqladmin's default selectinload.
+    relation_loaders: ClassVar[dict[str, Callable[[Any], Any]]] = {}
+    # Select only the columns shown on list/details pages; any other column raises instead of lazy loading.
+    list_load_only: bool = False
+    details_load_only: bool = False
+    # Raise on lazy loads of relationships not loaded up front, so a list page can't turn into N+1 queries.
+    raise_on_lazy_load: bool = True
+    # Export through a server-side cursor and send the file while it is being encoded, instead of loading all rows.
+    stream_export: bool = True
+    export_batch_size: int = 1000
+    export_types: ClassVar[list[str]] = ["csv", "ndjson", "json"]
+
+    def __init__(self):
+        super().__init__()
+        # Keep sqladmin from adding its own selectinload() for relationships with a declared strategy.
+        self._list_relations = [
+            relation for relation in self._list_relations if relation.key not in self.relation_loaders
+        ]
+        self._details_relations = [
+            relation for relation in self._details_relations if relation.key not in self.relation_loaders
+        ]
+
     def is_accessible(self, request: Request) -> bool:
         return check_accesses_level(
             AccessLevel.support, request.session["access_level"]
@@ -15,3 +54,90 @@ class CustomModelView(ModelView):
         return check_accesses_level(
             AccessLevel.support, request.session["access_level"]
         )
+
+    async def count(self, request: Request, stmt: Select | None = None) -> int:
+        if self.approximate_count and set(request.query_params) <= _UNFILTERED_LIST_PARAMS:
+            async with self.session_maker(expire_on_commit=False) as session:
+                return await BaseRepository(self.model, session).count(approximate=True)
+        return await super().count(request, stmt)
+
+    def list_query(self, request: Request) -> Select:
+        # Exports select the exported columns rather than the list page's (see get_model_objects).
+        prop_names = self._export_prop_names if getattr(request.state, "export", False) else self._list_prop_names
+        return super().list_query(request).options(*self._loader_options(prop_names, self.list_load_only))
+
+    def details_query(self, request: Request) -> Select:
+        return super().details_query(request).options(
+            *self._loader_options(self._details_prop_names, self.details_load_only)
+        )
+
+    async def get_model_objects(self, request: Request, limit: int | None = 0) -> Any:
+        """
+        For streaming exports return the not yet started batch iterator; rows are read while the response is sent.
+        The rows are those of `list_query`, so views that narrow their list export only what they list.
+        """
+        if not self.stream_export:
+            return await super().get_model_objects(request, limit)
+
+        request.state.export = True
+        query = self.list_query(request).order_by(*self.pk_columns).options(
+            *(
+                selectinload(getattr(self.model, name))
+                for name in self._export_prop_names
+                if name in self._relation_names and name not in self.relation_loaders
+            )
+        )
+        return self._export_batches(query.limit(limit or None))
+
+    async def export_data(self, data: Any, export_type: str = "csv", request: Request | None = None) -> Response:
+        if not hasattr(data, "__aiter__"):
+            if export_type != "ndjson":
+                return await super().export_data(data, export_type, request)
+            data = _single_batch(data)
+
+        filename = secure_filename(self.get_export_name(export_type=export_type))
+        return StreamingResponse(
+            encode_rows(data, self._export_prop_names, export_type),
+            media_type=EXPORT_MEDIA_TYPES[export_type],
+            headers={"Content-Disposition": f"attachment;filename={filename}"},
+        )
+
+    async def _export_batches(self, query: Select) -> AsyncIterator[Sequence[Any]]:
+        """
+        Read the exported rows through a server-side cursor, 'export_batch_size' rows at a time.
+        """
+        async with self.session_maker(expire_on_commit=False) as session:
+            async for batch in BaseRepository(self.model, session).stream(
+                query=query, batch_size=self.export_batch_size, batches=True
+            ):
+                yield batch
+
+    def _loader_options(self, prop_names: list[str], project: bool) -> list:
+        """
+        Loader options for the shown properties: the declared relationship loaders and, with 'project',
+        a load_only() of the shown columns.
+        """
+        options = [
+            loader(getattr(self.model, name))
+            for name, loader in self.relation_loaders.items()
+            if name in prop_names
+        ]
+
+        if project:
+            columns = {name for name in prop_names if name not in self._relation_names}
+            for name in prop_names:
+                if name in self._relation_names:
+                    # Relationship loaders need the foreign key columns of the row.
+                    relationship = self._mapper.relationships[name]
+                    columns.update(
+                        self._mapper.get_property_by_column(column).key for column in relationship.local_columns
+                    )
+            options.append(load_only(*(getattr(self.model, name) for name in sorted(columns)), raiseload=True))
+
+        if self.raise_on_lazy_load:
+            options.append(raiseload("*"))
+        return options
+
+
+async def _single_batch(rows: Sequence[Any]) -> AsyncIterator[Sequence[Any]]:
+    yield rows
@@ -0,0 +1,23 @@
+import uuid
+
+from core.env import (
+    ADMIN_SESSION_CACHE_NEGATIVE_TTL,
+    ADMIN_SESSION_CACHE_SIZE,
+    ADMIN_SESSION_CACHE_TTL,
+)
+from helpers.cache import TTLCache
+
+
+# Validated admin session tokens mapped to their user_id, or None for unknown tokens.
+# The cache is per process: a logout handled by another worker is seen here once the entry expires.
+session_cache = TTLCache(
+    maxsize=ADMIN_SESSION_CACHE_SIZE,
+    ttl=ADMIN_SESSION_CACHE_TTL,
+    negative_ttl=ADMIN_SESSION_CACHE_NEGATIVE_TTL,
+)
+
+
+def session_cache_key(token: str | uuid.UUID) -> str:
+    if isinstance(token, uuid.UUID):
+        return token.hex
+    return str(token).replace("-", "").lower()
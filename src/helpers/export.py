@@ -0,0 +1,90 @@
+import csv
+import datetime
+import io
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import inspect
+
+from db.types.json_codec import json_codec
+
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def export_value(obj: Any, name: str) -> Any:
+    """
+    Read a (dotted) attribute of a loaded record as a CSV/JSON friendly value.
+    """
+    value = obj
+    for part in name.split("."):
+        value = getattr(value, part, None)
+        if value is None:
+            return None
+    return _plain_value(value)
+
+
+def _plain_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    state = inspect(value, raiseerr=False)
+    if state is not None and state.identity is not None:
+        # Related records are exported as their primary key.
+        identity = state.identity
+        return _plain_value(identity[0]) if len(identity) == 1 else ",".join(map(str, identity))
+    return str(value)
+
+
+async def encode_rows(
+    batches: AsyncIterable[Sequence[Any]],
+    columns: Sequence[str],
+    export_type: str,
+) -> AsyncIterator[str]:
+    """
+    Encode batches of records as CSV, NDJSON or a JSON array, one text chunk per batch.
+    The header (or opening bracket) is produced before the first batch is read, so the first bytes are sent
+    while the query is still running.
+    """
+    if export_type not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export type {export_type!r}, expected one of {', '.join(EXPORT_MEDIA_TYPES)}")
+
+    if export_type == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+        async for batch in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                ["" if value is None else value for value in (export_value(row, name) for name in columns)]
+                for row in batch
+            )
+            yield buffer.getvalue()
+        return
+
+    dumps = json_codec.dumps
+    if export_type == "ndjson":
+        async for batch in batches:
+            yield "".join(
+                dumps({name: export_value(row, name) for name in columns}) + "\n" for row in batch
+            )
+        return
+
+    yield "["
+    separator = ""
+    async for batch in batches:
+        if not batch:
+            continue
+        yield separator + ",".join(dumps({name: export_value(row, name) for name in columns}) for row in batch)
+        separator = ","
+    yield "]"
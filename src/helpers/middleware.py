@@ -0,0 +1,32 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.instrumentation import track_queries
+
+
+class QueryStatsMiddleware:
+    """
+    Track the statements each request executes and report them in X-DB-Queries / X-DB-Time response headers,
+    and transaction retries in X-DB-Retries.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.queries)
+                    headers["X-DB-Time"] = f"{stats.total_time * 1000:.1f}ms"
+                    if stats.retries:
+                        headers["X-DB-Retries"] = str(stats.retries)
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
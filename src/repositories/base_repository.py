@@ -1,8 +1,29 @@
+import json
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable
+from itertools import islice
 from typing import Type, TypeVar, Generic, Optional, Any, Sequence
 
-from sqlalchemy import select, func, Row, RowMapping
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import Select, any_, bindparam, delete, insert, select, text, tuple_, update, func, inspect, Row, RowMapping
+from sqlalchemy.exc import CompileError, MultipleResultsFound, NoResultFound
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+from db.expressions import Explain
+from helpers.cache import MISSING
+from repositories.enums import LockMode
+from repositories.loader import EntityLoader
+from repositories.pagination import (
+    KeysetPage,
+    Page,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    keyset_order_by,
+    split_order_by,
+)
+from repositories.result_cache import detached_copies, mark_written, result_cache, written_tables
+from repositories.statement_cache import statement_cache
 
 
 T = TypeVar("T")
@@ -13,9 +34,23 @@ class BaseRepository(Generic[T]):
     Base repository providing common CRUD operations for async sessions.
     """
 
-    def __init__(self, model: Type[T], session: AsyncSession):
+    lock_mode: LockMode = LockMode.none
+    # count(approximate=True) falls back to an exact count below this many estimated rows.
+    approximate_count_threshold: int = 10000
+
+    def __init__(
+        self, model: Type[T], session: AsyncSession, autocommit: bool = True, cache_ttl: Optional[float] = None
+    ):
+        """
+        With 'autocommit' every write method commits; without it writes are only flushed and the caller
+        (normally a UnitOfWork) commits them together.
+        With 'cache_ttl' (seconds) unlocked entity reads go through the shared result cache and always return
+        detached copies, so only use it for read-only lookups: changes made to the results are never written.
+        """
         self.model = model
         self.session = session
+        self.autocommit = autocommit
+        self.cache_ttl = cache_ttl
 
     async def get(
         self,
@@ -25,36 +60,80 @@ class BaseRepository(Generic[T]):
         left_joins: Optional[list[tuple[Any, Any]]] = None,
         order_by=None,
         options: Optional[list] = None,
+        lock: Optional[LockMode] = None,
     ) -> Optional[T]:
         """
         Retrieve a single record by its ID or using optional filters, joins, ordering and loader options.
         If 'id' is provided, it will be added as a filter.
+        The row is locked according to 'lock', or the repository's `lock_mode` if not given.
         """
+        lock = LockMode(lock or self.lock_mode)
+
+        if pk is not None and not (filters or joins or left_joins or options) and order_by is None:
+            query = self._cached_statement(
+                ("get", lock),
+                lambda: self._with_lock(
+                    select(self.model).where(self.model.id == bindparam("pk")), lock
+                ),
+            )
+            return self._one_or_none(await self._fetch_all(query, {"pk": pk}, lock))
+
         filters = filters or []
-        joins = joins or []
-        left_joins = left_joins or []
-        options = options or []
 
         if pk is not None:
             filters.append(self.model.id == pk)
 
-        query = select(self.model).where(*filters)
-
-        for join_item in joins:
-            query = query.join(join_item)
-
-        for left_join_item in left_joins:
-            target, condition = left_join_item
-            query = query.outerjoin(target, condition)
-
-        if order_by is not None:
-            query = query.order_by(order_by)
-
-        for opt in options:
-            query = query.options(opt)
-
-        result = await self.session.execute(query.with_for_update())
-        return result.scalar_one_or_none()
+        query = self._apply_clauses(
+            select(self.model).where(*filters),
+            joins=joins,
+            left_joins=left_joins,
+            order_by=order_by,
+            options=options,
+        )
+
+        return self._one_or_none(
+            await self._fetch_all(self._with_lock(query, lock), lock=lock, cache=not options)
+        )
+
+    async def get_many(
+        self, pks: Iterable[Any], lock: Optional[LockMode] = None, chunk_size: int = 1000
+    ) -> list[Optional[T]]:
+        """
+        Retrieve records by ID, in the order of 'pks', with None for IDs that do not exist.
+        IDs are looked up 'chunk_size' at a time, as one `= ANY(:pks)` array parameter on PostgreSQL and an
+        expanding IN elsewhere; duplicates are fetched once. Locked lookups go in ID order to avoid deadlocks.
+        """
+        lock = LockMode(lock or self.lock_mode)
+        pks = list(pks)
+        unique = list(dict.fromkeys(pks))
+        if lock is not LockMode.none:
+            unique.sort()
+
+        as_array = self.session.bind.dialect.name == "postgresql"
+        query = self._cached_statement(
+            ("get_many", lock, as_array),
+            lambda: self._with_lock(
+                select(self.model).where(
+                    self.model.id == any_(bindparam("pks", type_=ARRAY(self.model.id.type)))
+                    if as_array
+                    else self.model.id.in_(bindparam("pks", expanding=True))
+                ),
+                lock,
+            ),
+        )
+
+        found = {}
+        for start in range(0, len(unique), chunk_size):
+            result = await self.session.execute(query, {"pks": unique[start:start + chunk_size]})
+            for instance in result.scalars():
+                found[instance.id] = instance
+        return [found.get(pk) for pk in pks]
+
+    def loader(self, max_batch_size: int = 1000) -> "EntityLoader[T]":
+        """
+        Return a loader that batches the `load(pk)` calls of concurrent coroutines into `get_many` queries.
+        """
+        return EntityLoader(self, max_batch_size)
 
     async def get_all(
         self,
@@ -70,94 +149,641 @@ class BaseRepository(Generic[T]):
         Retrieve all records with optional filters, joins, pagination, ordering and loader options.
         """
         filters = filters or []
-        joins = joins or []
-        left_joins = left_joins or []
-        options = options or []
 
-        query = select(self.model).where(*filters)
-
-        for join_item in joins:
-            query = query.join(join_item)
+        query = self._apply_clauses(
+            select(self.model).where(*filters),
+            joins=joins,
+            left_joins=left_joins,
+            order_by=order_by,
+            options=options,
+        )
+        query = query.limit(limit).offset(offset)
 
-        for left_join_item in left_joins:
-            target, condition = left_join_item
-            query = query.outerjoin(target, condition)
+        return await self._fetch_all(query, cache=not options)
 
-        if order_by is not None:
-            if isinstance(order_by, list) or isinstance(order_by, tuple):
-                query = query.order_by(*order_by)
-            else:
-                query = query.order_by(order_by)
+    async def get_page(
+        self,
+        filters: Optional[list] = None,
+        joins: Optional[list] = None,
+        left_joins: Optional[list[tuple[Any, Any]]] = None,
+        limit: int = 10,
+        offset: int = 0,
+        order_by=None,
+        options: Optional[list] = None,
+    ) -> Page[T]:
+        """
+        Retrieve a page of records together with the total number of matching records.
+        The total comes from a count(*) OVER () window in the same statement; only a page past the end
+        needs a separate count query.
+        """
+        filters = filters or []
 
+        query = self._apply_clauses(
+            select(self.model, func.count().over().label("total")).where(*filters),
+            joins=joins,
+            left_joins=left_joins,
+            order_by=order_by,
+            options=options,
+        )
         query = query.limit(limit).offset(offset)
 
-        for opt in options:
-            query = query.options(opt)
+        result = await self.session.execute(query)
+        rows = result.all()
+
+        if rows:
+            total = rows[0].total
+        elif offset == 0:
+            total = 0
+        else:
+            total = await self.count(filters=filters, joins=joins, left_joins=left_joins)
+
+        return Page(items=[row[0] for row in rows], total=total, limit=limit, offset=offset)
+
+    async def get_all_keyset(
+        self,
+        order_by=None,
+        after: Optional[Sequence[Any]] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[list] = None,
+        joins: Optional[list] = None,
+        left_joins: Optional[list[tuple[Any, Any]]] = None,
+        limit: int = 10,
+        options: Optional[list] = None,
+        before: Optional[Sequence[Any]] = None,
+        before_cursor: Optional[str] = None,
+    ) -> KeysetPage[T]:
+        """
+        Retrieve a page of records using keyset (seek) pagination instead of OFFSET.
+        Pass the previous page's `next_key` as 'after' or its `next_cursor` as 'cursor' to get the next page,
+        or a page's `prev_key` as 'before' or its `prev_cursor` as 'before_cursor' to get the page preceding it.
+        Primary key columns are appended to 'order_by' as a tiebreaker so the sort key is always unique.
+        Nullable sort columns keep NULLs last in ascending order and first in descending order.
+        """
+        if sum(bound is not None for bound in (after, cursor, before, before_cursor)) > 1:
+            raise ValueError("Pass only one of 'after', 'cursor', 'before' or 'before_cursor'")
+        if cursor is not None:
+            after = decode_cursor(cursor)
+        if before_cursor is not None:
+            before = decode_cursor(before_cursor)
+
+        filters = list(filters or [])
+        keys = [(self._column_of(column), descending) for column, descending in split_order_by(order_by)]
+        for pk_column in inspect(self.model).primary_key:
+            if not any(pk_column.compare(column) for column, _ in keys):
+                keys.append((pk_column, False))
+
+        backward = before is not None
+        # A page before 'before' is read in reverse order and flipped back afterwards.
+        seek_keys = [(column, not descending) for column, descending in keys] if backward else keys
+        if after is not None or backward:
+            filters.append(keyset_condition(seek_keys, tuple(before if backward else after)))
+
+        query = self._apply_clauses(
+            select(self.model, *[column for column, _ in keys]).where(*filters),
+            joins=joins,
+            left_joins=left_joins,
+            order_by=keyset_order_by(seek_keys),
+            options=options,
+        )
+        query = query.limit(limit + 1)
+
+        result = await self.session.execute(query)
+        rows = result.all()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if backward:
+            rows.reverse()
+
+        first_key = tuple(rows[0][1:]) if rows else None
+        last_key = tuple(rows[-1][1:]) if rows else None
+        if backward:
+            # The 'before' row itself follows this page.
+            next_key, prev_key = last_key, first_key if more else None
+        else:
+            next_key, prev_key = last_key if more else None, first_key if after is not None else None
+
+        return KeysetPage(
+            items=[row[0] for row in rows],
+            next_key=next_key,
+            next_cursor=encode_cursor(next_key) if next_key is not None else None,
+            prev_key=prev_key,
+            prev_cursor=encode_cursor(prev_key) if prev_key is not None else None,
+        )
+
+    async def claim(
+        self,
+        limit: int = 1,
+        filters: Optional[list] = None,
+        order_by=None,
+        options: Optional[list] = None,
+    ) -> Sequence[T]:
+        """
+        Lock and return up to 'limit' records, skipping rows already locked by other transactions.
+        Concurrent workers calling this get disjoint sets of records; the locks are held until the session commits.
+        """
+        filters = filters or []
+
+        query = self._apply_clauses(
+            select(self.model).where(*filters),
+            order_by=order_by,
+            options=options,
+        )
+        query = self._with_lock(query.limit(limit), LockMode.skip_locked)
 
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def stream(
+        self,
+        filters: Optional[list] = None,
+        joins: Optional[list] = None,
+        left_joins: Optional[list[tuple[Any, Any]]] = None,
+        order_by=None,
+        options: Optional[list] = None,
+        batch_size: int = 1000,
+        batches: bool = False,
+        query: Optional[Select] = None,
+    ) -> AsyncIterator[T | Sequence[T]]:
+        """
+        Iterate over all matching records using a server-side cursor.
+        Rows are fetched 'batch_size' at a time, so memory use does not grow with the size of the result.
+        Yields single records, or lists of up to 'batch_size' records if 'batches' is set.
+        The clauses are added to 'query' if given (a select of the model), otherwise to a select of all records.
+        """
+        filters = filters or []
+
+        query = self._apply_clauses(
+            (select(self.model) if query is None else query).where(*filters),
+            joins=joins,
+            left_joins=left_joins,
+            order_by=order_by,
+            options=options,
+        )
+        query = query.execution_options(yield_per=batch_size)
+
+        result = await self.session.stream(query)
+        try:
+            if batches:
+                async for partition in result.scalars().partitions():
+                    yield partition
+            else:
+                async for instance in result.scalars():
+                    yield instance
+        finally:
+            await result.close()
+
     async def create(self, instance: T) -> T:
         """
         Create a new record.
+        Server-generated values are fetched by the INSERT's RETURNING clause, so the instance is only refreshed
+        when the commit expired it.
         """
         self.session.add(instance)
-        await self.session.commit()
-        await self.session.refresh(instance)
+        await self._commit()
+        await self._refresh_expired(instance)
         return instance
 
     async def bulk_create(self, instances: list[T]) -> None:
         self.session.add_all(instances)
-        await self.session.commit()
+        await self._commit()
+
+    async def bulk_insert(
+        self,
+        rows: Iterable[dict | tuple | T],
+        columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+        returning: bool = False,
+        use_copy: bool = False,
+    ) -> int | list:
+        """
+        Insert many records without building ORM objects and unit-of-work state for each of them.
+        Rows may be dicts keyed by attribute name, tuples matching 'columns', or model instances.
+        Rows are sent in chunks of 'chunk_size' as multi-row INSERTs; with 'use_copy' on asyncpg they are
+        sent with binary COPY instead. Column types' bind processing (password hashing, JSON encoding) still runs.
+        Returns the primary keys of the inserted rows if 'returning' is set, otherwise the number of inserted rows.
+        """
+        mapper = inspect(self.model)
+        dialect = self.session.bind.dialect
+        copy_supported = use_copy and not returning and dialect.driver == "asyncpg"
+
+        query = insert(self.model)
+        if returning:
+            query = query.returning(
+                *[getattr(self.model, mapper.get_property_by_column(column).key) for column in mapper.primary_key],
+                sort_by_parameter_order=True,
+            )
+
+        inserted = 0
+        pks = []
+        rows = iter(rows)
+        while chunk := [self._bulk_row(row, columns) for row in islice(rows, chunk_size)]:
+            if copy_supported and await self._copy_chunk(chunk):
+                inserted += len(chunk)
+                continue
+
+            result = await self.session.execute(query, chunk)
+            if returning:
+                pks.extend(row[0] if len(row) == 1 else tuple(row) for row in result.all())
+            inserted += len(chunk)
+
+        await self._commit()
+        return pks if returning else inserted
+
+    async def bulk_upsert(
+        self,
+        rows: Iterable[dict | tuple | T],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        Insert many records, updating the existing record instead where 'conflict_columns' (a unique key) match.
+        Each chunk is one INSERT ... ON CONFLICT (...) DO UPDATE statement per set of supplied columns:
+        'update_columns' defaults to the columns a row gives outside the conflict key, so columns left out of a row
+        keep their stored value. Rows take the same forms as in `bulk_insert`.
+        Returns the number of rows sent.
+        """
+        dialect = self.session.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            raise NotImplementedError(f"bulk_upsert is not supported on {dialect}")
+
+        written = 0
+        rows = iter(rows)
+        while chunk := [self._bulk_row(row, columns) for row in islice(rows, chunk_size)]:
+            groups: dict[tuple, list[dict]] = {}
+            for row in chunk:
+                groups.setdefault(tuple(row), []).append(row)
+            for supplied, group in groups.items():
+                query = dialect_insert(self.model)
+                names = update_columns or [name for name in supplied if name not in conflict_columns]
+                query = query.on_conflict_do_update(
+                    index_elements=[getattr(self.model, name) for name in conflict_columns],
+                    set_={name: query.excluded[name] for name in names},
+                )
+                await self.session.execute(query, group)
+            written += len(chunk)
+
+        await self._commit()
+        return written
+
+    def _bulk_row(self, row: dict | tuple | T, columns: Optional[Sequence[str]]) -> dict:
+        """
+        Normalize a bulk insert row into a dict keyed by attribute name.
+        """
+        if isinstance(row, dict):
+            return row
+        if isinstance(row, tuple):
+            if columns is None:
+                raise ValueError("'columns' is required to insert rows given as tuples")
+            return dict(zip(columns, row))
+        if isinstance(row, self.model):
+            loaded = inspect(row).dict
+            return {
+                attr.key: loaded[attr.key]
+                for attr in inspect(self.model).column_attrs
+                if attr.key in loaded
+            }
+        raise TypeError(f"Cannot insert {type(row)} into {self.model.__name__}")
+
+    async def _copy_chunk(self, chunk: list[dict]) -> bool:
+        """
+        Send a chunk of rows with asyncpg binary COPY.
+        Python-side column defaults are filled in here; returns False without sending anything
+        if a missing column has a SQL expression default that COPY cannot evaluate.
+        """
+        mapper = inspect(self.model)
+        table = mapper.local_table
+        dialect = self.session.bind.dialect
+
+        keys = list(dict.fromkeys(key for row in chunk for key in row))
+        target = [mapper.column_attrs[key].columns[0] for key in keys]
+        for column in table.columns:
+            if any(column is given for given in target) or column.default is None:
+                continue
+            if not (column.default.is_scalar or column.default.is_callable):
+                return False
+            keys.append(None)
+            target.append(column)
+
+        processors = [column.type.bind_processor(dialect) for column in target]
+        records = []
+        for row in chunk:
+            record = []
+            for key, column, processor in zip(keys, target, processors):
+                if key is not None and key in row:
+                    value = row[key]
+                elif column.default is not None and column.default.is_callable:
+                    value = column.default.arg(None)
+                elif column.default is not None:
+                    value = column.default.arg
+                else:
+                    value = None
+                record.append(processor(value) if processor else value)
+            records.append(tuple(record))
+
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name,
+            records=records,
+            columns=[column.name for column in target],
+            schema_name=table.schema,
+        )
+        return True
 
     async def update(self, pk: int, **kwargs) -> T:
         """
         Update a record by ID.
         """
-        obj = await self.get(pk)
+        obj = await self.get(pk, lock=LockMode.update)
         if not obj:
             raise NoResultFound(f"{self.model.__name__} with id {pk} not found")
 
         for key, value in kwargs.items():
             setattr(obj, key, value)
 
-        await self.session.commit()
-        await self.session.refresh(obj)
+        await self._commit()
+        await self._refresh_expired(obj)
         return obj
 
     async def delete(self, pk: int) -> Optional[T]:
         """
         Delete a record by ID.
         """
-        obj = await self.get(pk)
+        obj = await self.get(pk, lock=LockMode.update)
         if not obj:
             raise NoResultFound(f"{self.model.__name__} with id {pk} not found")
 
         await self.session.delete(obj)
-        await self.session.commit()
+        await self._commit()
         return obj
 
+    async def update_where(
+        self,
+        filters: list,
+        values: dict,
+        returning: bool = False,
+        synchronize_session: str | bool = "auto",
+    ) -> int | Sequence[T]:
+        """
+        Update all records matching filters with a single UPDATE ... WHERE statement.
+        Returns the updated records if 'returning' is set, otherwise the number of affected rows.
+        """
+        if not filters:
+            raise ValueError("update_where requires filters, use true() to update every row")
+
+        query = update(self.model).where(*filters).values(**values)
+        if returning:
+            query = query.returning(self.model)
+
+        result = await self.session.execute(
+            query, execution_options={"synchronize_session": synchronize_session}
+        )
+        updated = result.scalars().all() if returning else result.rowcount
+        await self._commit()
+        return updated
+
+    async def delete_where(
+        self,
+        filters: list,
+        returning: bool = False,
+        synchronize_session: str | bool = "auto",
+    ) -> int | Sequence[T]:
+        """
+        Delete all records matching filters with a single DELETE ... WHERE statement.
+        Returns the deleted records if 'returning' is set, otherwise the number of affected rows.
+        """
+        if not filters:
+            raise ValueError("delete_where requires filters, use true() to delete every row")
+
+        query = delete(self.model).where(*filters)
+        if returning:
+            query = query.returning(self.model)
+
+        result = await self.session.execute(
+            query, execution_options={"synchronize_session": synchronize_session}
+        )
+        deleted = result.scalars().all() if returning else result.rowcount
+        await self._commit()
+        return deleted
+
+    async def delete_batched(
+        self,
+        filters: list,
+        batch_size: int = 1000,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """
+        Delete all records matching filters in batches of 'batch_size', committing after each batch.
+        Every batch locks its rows with SKIP LOCKED, so rows in use by other transactions are left for a later run
+        and locks are only held for one short statement. Returns the number of deleted rows.
+        Without autocommit all batches run in the caller's transaction and keep their locks until it commits.
+        """
+        if not filters:
+            raise ValueError("delete_batched requires filters, use true() to delete every row")
+
+        pk_columns = inspect(self.model).primary_key
+        batch = self._with_lock(
+            select(*pk_columns).where(*filters).limit(batch_size), LockMode.skip_locked
+        )
+        target = pk_columns[0] if len(pk_columns) == 1 else tuple_(*pk_columns)
+        query = delete(self.model).where(target.in_(batch))
+
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            result = await self.session.execute(
+                query, execution_options={"synchronize_session": False}
+            )
+            await self._commit()
+            total += result.rowcount
+            batches += 1
+            if result.rowcount < batch_size:
+                break
+        return total
+
     async def count(
         self,
         filters: Optional[list] = None,
         joins: Optional[list] = None,
         left_joins: Optional[list[tuple[Any, Any]]] = None,
+        approximate: bool = False,
     ) -> int:
         """
         Count the number of records with optional filters and joins.
+        With 'approximate' on PostgreSQL the planner's row estimate is returned instead, unless it is
+        below `approximate_count_threshold`, where an exact count is cheap anyway.
         """
+        if approximate and self.session.bind.dialect.name == "postgresql":
+            estimate = await self._estimate_count(filters, joins, left_joins)
+            if estimate is not None and estimate >= self.approximate_count_threshold:
+                return estimate
+
+        if not (filters or joins or left_joins):
+            query = self._cached_statement(
+                "count", lambda: select(func.count()).select_from(self.model)
+            )
+            result = await self.session.execute(query)
+            return result.scalar()
+
         filters = filters or []
-        joins = joins or []
-        left_joins = left_joins or []
 
-        query = select(func.count()).select_from(self.model).where(*filters)
+        query = self._apply_clauses(
+            select(func.count()).select_from(self.model).where(*filters),
+            joins=joins,
+            left_joins=left_joins,
+        )
 
-        for join_item in joins:
+        result = await self.session.execute(query)
+        return result.scalar()
+
+    async def _estimate_count(
+        self,
+        filters: Optional[list] = None,
+        joins: Optional[list] = None,
+        left_joins: Optional[list[tuple[Any, Any]]] = None,
+    ) -> Optional[int]:
+        """
+        Estimate the number of matching records from PostgreSQL statistics.
+        Unfiltered counts use pg_class.reltuples, filtered ones the row estimate of the query plan.
+        Returns None if the table has never been analyzed or the filters cannot be rendered for EXPLAIN.
+        """
+        if not (filters or joins or left_joins):
+            table = inspect(self.model).local_table
+            result = await self.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": table.fullname},
+            )
+            estimate = result.scalar()
+            return estimate if estimate is not None and estimate >= 0 else None
+
+        query = self._apply_clauses(
+            select(self.model).where(*(filters or [])),
+            joins=joins,
+            left_joins=left_joins,
+        )
+        try:
+            result = await self.session.execute(Explain(query))
+        except CompileError:
+            return None
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def _fetch_all(
+        self, query: Executable, params: Optional[dict] = None, lock: LockMode = LockMode.none, cache: bool = True
+    ) -> Sequence[T]:
+        """
+        Execute a select of entities, going through the result cache when `cache_ttl` is set.
+        Locking reads, reads with loader options (the cache keeps column values only) and reads of tables this
+        session has written but not committed always go to the database.
+        """
+        if not cache or self.cache_ttl is None or lock is not LockMode.none or not result_cache.enabled:
+            result = await self.session.execute(query, params)
+            return result.scalars().all()
+
+        key, tags = result_cache.key(query, params)
+        if tags & written_tables(self.session):
+            result = await self.session.execute(query, params)
+            return detached_copies(result.scalars().all())
+
+        cached = result_cache.get(key)
+        if cached is not MISSING:
+            return cached
+        generation = result_cache.generation(tags)
+        result = await self.session.execute(query, params)
+        instances = result.scalars().all()
+        result_cache.set(key, instances, tags, self.cache_ttl, generation)
+        # Misses return detached copies too, so callers never get a mix of attached and detached objects.
+        return detached_copies(instances)
+
+    @staticmethod
+    def _one_or_none(instances: Sequence[T]) -> Optional[T]:
+        if len(instances) > 1:
+            raise MultipleResultsFound("Multiple rows were found when one or none was required")
+        return instances[0] if instances else None
+
+    async def _commit(self):
+        """
+        Commit a write made by this repository, or only flush it when the transaction is managed by the caller.
+        """
+        # Writes that bypass the ORM (COPY) are not seen by the session events; mark the table explicitly.
+        mark_written(self.session, [self.model.__table__.fullname])
+        if self.autocommit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    async def _refresh_expired(self, instance: T) -> None:
+        """
+        Reload 'instance' after a commit on a session with expire_on_commit; its attributes would otherwise be
+        loaded lazily on access, which fails outside of an awaited call.
+        """
+        if self.autocommit and self.session.sync_session.expire_on_commit:
+            await self.session.refresh(instance)
+
+    @staticmethod
+    def _with_lock(query, lock: LockMode):
+        """
+        Apply the row-lock clause for 'lock' to a select statement.
+        """
+        if lock is LockMode.update:
+            return query.with_for_update()
+        if lock is LockMode.share:
+            return query.with_for_update(read=True)
+        if lock is LockMode.nowait:
+            return query.with_for_update(nowait=True)
+        if lock is LockMode.skip_locked:
+            return query.with_for_update(skip_locked=True)
+        return query
+
+    def _cached_statement(self, name: Hashable, builder: Callable[[], Executable]) -> Executable:
+        """
+        Return a statement for this model from the shared statement cache, building it on first use.
+        Statements should take their values as bindparam()s so that one statement fits every call.
+        """
+        return statement_cache.get((self.model, name), builder)
+
+    @staticmethod
+    def _column_of(expression):
+        """
+        Return the SQL column expression behind an ORM attribute.
+        """
+        if hasattr(expression, "__clause_element__"):
+            return expression.__clause_element__()
+        return expression
+
+    @staticmethod
+    def _apply_clauses(
+        query,
+        joins: Optional[list] = None,
+        left_joins: Optional[list[tuple[Any, Any]]] = None,
+        order_by=None,
+        options: Optional[list] = None,
+    ):
+        """
+        Apply joins, outer joins, ordering and loader options to a select statement.
+        """
+        for join_item in joins or []:
             query = query.join(join_item)
 
-        for left_join_item in left_joins:
+        for left_join_item in left_joins or []:
             target, condition = left_join_item
             query = query.outerjoin(target, condition)
 
-        result = await self.session.execute(query)
-        return result.scalar()
+        if order_by is not None:
+            if isinstance(order_by, list) or isinstance(order_by, tuple):
+                query = query.order_by(*order_by)
+            else:
+                query = query.order_by(order_by)
+
+        for opt in options or []:
+            query = query.options(opt)
+
+        return query
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class LockMode(str, Enum):
+    none = "none"
+    update = "update"
+    share = "share"
+    nowait = "nowait"
+    skip_locked = "skip_locked"
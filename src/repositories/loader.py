@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import Hashable, Iterable
+from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from repositories.base_repository import BaseRepository
+
+
+T = TypeVar("T")
+
+
+class EntityLoader(Generic[T]):
+    """
+    Coalesces `load(pk)` calls into batched `get_many` queries, in the manner of a DataLoader.
+    Calls made before the event loop's next iteration are sent together, so coroutines run with
+    `asyncio.gather` share one query instead of one round trip each. Batches run one at a time,
+    which also keeps them from using the repository's session concurrently.
+    """
+
+    def __init__(self, repository: "BaseRepository[T]", max_batch_size: int = 1000):
+        self.repository = repository
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, pk: Any) -> Optional[T]:
+        """
+        Return the record with ID 'pk', or None, fetched together with the other IDs requested in this tick.
+        """
+        future = self._pending.get(pk)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[pk] = loop.create_future()
+            if len(self._pending) == 1:
+                loop.call_soon(self._dispatch)
+        # A cancelled caller must not cancel the result shared with the other callers.
+        return await asyncio.shield(future)
+
+    async def load_many(self, pks: Iterable[Any]) -> list[Optional[T]]:
+        return list(await asyncio.gather(*(self.load(pk) for pk in pks)))
+
+    def _dispatch(self):
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[Hashable, asyncio.Future]):
+        async with self._lock:
+            try:
+                instances = await self.repository.get_many(batch, chunk_size=self.max_batch_size)
+            except asyncio.CancelledError:
+                for future in batch.values():
+                    future.cancel()
+                raise
+            except Exception as ex:
+                for future in batch.values():
+                    if not future.done():
+                        future.set_exception(ex)
+                return
+            self.batches += 1
+            for future, instance in zip(batch.values(), instances):
+                if not future.done():
+                    future.set_result(instance)
@@ -0,0 +1,194 @@
+import base64
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, Generic, Optional, Sequence, TypeVar
+
+from sqlalchemy import and_, false, literal, or_, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    """
+    A page of records fetched with keyset pagination.
+    `next_key` is the sort key tuple of the last item and `prev_key` that of the first item, for fetching the
+    following page with 'after' or the preceding one with 'before'; `next_cursor`/`prev_cursor` are the same keys
+    as opaque tokens. They are None when there are no records in that direction.
+    """
+
+    items: Sequence[T]
+    next_key: Optional[tuple]
+    next_cursor: Optional[str]
+    prev_key: Optional[tuple] = None
+    prev_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_key is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_key is not None
+
+
+@dataclass
+class Page(Generic[T]):
+    """
+    A page of records fetched with LIMIT/OFFSET together with the total number of matching records.
+    """
+
+    items: Sequence[T]
+    total: int
+    limit: int
+    offset: int
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        # Enum columns bind member names, so the decoded name compares like the member.
+        return {"e": value.name}
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"d": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"u": value.hex}
+    if isinstance(value, decimal.Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        (tag, raw), = value.items()
+        if tag == "dt":
+            return datetime.datetime.fromisoformat(raw)
+        if tag == "d":
+            return datetime.date.fromisoformat(raw)
+        if tag == "u":
+            return uuid.UUID(raw)
+        if tag == "n":
+            return decimal.Decimal(raw)
+        if tag == "e":
+            return raw
+        raise ValueError(f"Unknown cursor value tag {tag!r}")
+    return value
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """
+    Encode a sort key tuple into an opaque url-safe cursor token.
+    """
+    payload = json.dumps([_encode_value(value) for value in key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor token produced by `encode_cursor` back into a sort key tuple.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return tuple(_decode_value(value) for value in payload)
+    except (ValueError, TypeError) as ex:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from ex
+
+
+def split_order_by(order_by) -> list[tuple[Any, bool]]:
+    """
+    Split order_by clauses into (column expression, descending) pairs.
+    """
+    if order_by is None:
+        return []
+    if not isinstance(order_by, (list, tuple)):
+        order_by = [order_by]
+
+    keys = []
+    for clause in order_by:
+        descending = False
+        if isinstance(clause, UnaryExpression) and clause.modifier in (
+            operators.desc_op,
+            operators.asc_op,
+        ):
+            descending = clause.modifier is operators.desc_op
+            clause = clause.element
+        keys.append((clause, descending))
+    return keys
+
+
+def keyset_condition(keys: list[tuple[Any, bool]], values: Sequence[Any]):
+    """
+    Build the WHERE condition selecting rows that sort strictly after `values`.
+    NULLs sort after every value in ascending order and before them in descending order (see `keyset_order_by`).
+    A single row-value comparison is used when all keys share a direction and none is nullable, so the index can
+    be used for the seek; otherwise the condition is expanded column by column.
+    """
+    if len(keys) != len(values):
+        raise ValueError(
+            f"Keyset pagination expects {len(keys)} key values, got {len(values)}"
+        )
+
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1 and not any(_nullable(column) for column, _ in keys) and None not in values:
+        columns = [column for column, _ in keys]
+        descending = directions.pop()
+        if len(columns) == 1:
+            value = _bind(columns[0], values[0])
+            return columns[0] < value if descending else columns[0] > value
+        left = tuple_(*columns)
+        right = tuple_(*values, types=[getattr(column, "type", None) for column in columns])
+        return left < right if descending else left > right
+
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        equal_prefix = [_equal(keys[i][0], values[i]) for i in range(index)]
+        clauses.append(and_(*equal_prefix, _after(column, descending, values[index])))
+    return or_(*clauses)
+
+
+def keyset_order_by(keys: list[tuple[Any, bool]]) -> list:
+    """
+    ORDER BY clauses for the keys, with the NULL placement `keyset_condition` assumes made explicit for nullable
+    columns (it matches PostgreSQL's default, so indexes still apply there).
+    """
+    clauses = []
+    for column, descending in keys:
+        clause = column.desc() if descending else column.asc()
+        if _nullable(column):
+            clause = clause.nulls_first() if descending else clause.nulls_last()
+        clauses.append(clause)
+    return clauses
+
+
+def _nullable(column) -> bool:
+    return getattr(column, "nullable", True)
+
+
+def _bind(column, value):
+    return literal(value, getattr(column, "type", None))
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == _bind(column, value)
+
+
+def _after(column, descending: bool, value):
+    """
+    The column sorts strictly after 'value' in the given direction.
+    """
+    if value is None:
+        # NULLs come last ascending: nothing follows them. Descending they come first: every value follows.
+        return column.is_not(None) if descending else false()
+    if descending:
+        return column < _bind(column, value)
+    seek = column > _bind(column, value)
+    return or_(seek, column.is_(None)) if _nullable(column) else seek
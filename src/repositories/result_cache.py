@@ -0,0 +1,238 @@
+import datetime
+import decimal
+import enum
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from copy import deepcopy
+from dataclasses import dataclass
+from itertools import chain
+from threading import Lock
+from typing import Any, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.util import find_tables
+
+from core.env import RESULT_CACHE_MAX_BYTES, RESULT_CACHE_SIZE
+from helpers.cache import MISSING
+
+
+# Column values that can be handed out without copying.
+_IMMUTABLE = (
+    str, bytes, int, float, bool, type(None), frozenset,
+    datetime.date, datetime.time, datetime.timedelta, decimal.Decimal, uuid.UUID, enum.Enum,
+)
+
+
+@dataclass
+class _Entry:
+    rows: list[tuple[type, dict]]
+    tags: frozenset[str]
+    expires_at: float
+    size: int
+
+
+class ResultCache:
+    """
+    In-process LRU cache of ORM query results, bounded by entry count and estimated memory.
+    Entries are tagged with the tables their statement reads; a committed write to a table drops its entries.
+    Rows are stored as column values and handed out as new detached instances, so callers never share objects
+    with the cache or with each other. Writes made by other processes are only seen once entries expire.
+    """
+
+    def __init__(self, maxsize: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        # When False every repository reads from the database, whatever its cache_ttl.
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bytes = 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._tagged: dict[str, set[Hashable]] = {}
+        # Bumped on every invalidation of a table; a result read across an invalidation is not stored.
+        self._generations: dict[str, int] = {}
+        self._statement_tags: dict[Hashable, frozenset[str]] = {}
+        self._lock = Lock()
+
+    def key(self, statement: Executable, params: Optional[dict] = None) -> tuple[Hashable, frozenset[str]]:
+        """
+        Cache key of a statement, made of its structure, the values bound in it and the execution parameters,
+        together with the tables the statement reads.
+        """
+        cache_key = statement._generate_cache_key()
+        bound = tuple(_freeze(bind.effective_value) for bind in cache_key.bindparams)
+        extra = tuple(sorted((name, _freeze(value)) for name, value in (params or {}).items()))
+        tags = self._statement_tags.get(cache_key.key)
+        if tags is None:
+            tags = frozenset(table.fullname for table in find_tables(statement, include_joins=True))
+            if len(self._statement_tags) >= self.maxsize:
+                self._statement_tags.clear()
+            self._statement_tags[cache_key.key] = tags
+        return (cache_key.key, bound, extra), tags
+
+    def generation(self, tags: Iterable[str]) -> tuple:
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in sorted(tags))
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return new detached instances of the rows cached under 'key', or MISSING.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            rows = entry.rows
+        return [_detached_copy(model, values) for model, values in rows]
+
+    def set(self, key: Hashable, instances: Iterable[Any], tags: frozenset[str], ttl: float, generation: tuple):
+        """
+        Store the column values of 'instances' unless one of 'tags' was invalidated since 'generation' was taken.
+        """
+        rows = [(type(instance), _column_values(instance)) for instance in instances]
+        size = sys.getsizeof(rows) + sum(_sizeof(values) for _, values in rows)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if tuple(self._generations.get(tag, 0) for tag in sorted(tags)) != generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(rows, tags, time.monotonic() + ttl, size)
+            self.bytes += size
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags: Iterable[str]):
+        """
+        Drop every entry that reads one of the given tables.
+        """
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._tagged.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+
+
+def written_tables(session: Session) -> set[str]:
+    """
+    Tables written in the session's current transaction; reads of them bypass the cache until it ends.
+    """
+    return session.info.setdefault("result_cache_written", set())
+
+
+def mark_written(session: Session, tables: Iterable[str]):
+    written_tables(session).update(tables)
+
+
+def detached_copies(instances: Iterable[Any]) -> list:
+    """
+    New detached instances with the loaded column values of 'instances', as handed out on a cache hit.
+    """
+    return [_detached_copy(type(instance), _column_values(instance)) for instance in instances]
+
+
+def _column_values(instance: Any) -> dict:
+    state = inspect(instance)
+    loaded = state.dict
+    return {attr.key: loaded[attr.key] for attr in state.mapper.column_attrs if attr.key in loaded}
+
+
+def _detached_copy(model: type, values: dict) -> Any:
+    instance = inspect(model).class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(instance, key, value if isinstance(value, _IMMUTABLE) else deepcopy(value))
+    make_transient_to_detached(instance)
+    return instance
+
+
+def _sizeof(values: dict) -> int:
+    return sys.getsizeof(values) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in values.items())
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return type(value).__name__, tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+result_cache = ResultCache(maxsize=RESULT_CACHE_SIZE, max_bytes=RESULT_CACHE_MAX_BYTES)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed(session: Session, flush_context):
+    mark_written(
+        session,
+        (
+            table.fullname
+            for instance in chain(session.new, session.dirty, session.deleted)
+            for table in inspect(instance).mapper.tables
+        ),
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_written(orm_execute_state.session, [orm_execute_state.statement.table.fullname])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    written = session.info.pop("result_cache_written", None)
+    if written:
+        result_cache.invalidate(written)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop("result_cache_written", None)
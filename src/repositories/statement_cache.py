@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+
+from sqlalchemy.sql import Executable
+
+
+class StatementCache:
+    """
+    LRU cache of pre-built statements keyed by query shape.
+    Cached statements use bound parameters for their values, so one statement serves every call of the same shape
+    and SQLAlchemy's compiled cache is hit without rebuilding the construct.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: OrderedDict[Hashable, Executable] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, builder: Callable[[], Executable]) -> Executable:
+        """
+        Return the statement cached under 'key', building it with 'builder' on a miss.
+        """
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is not None:
+                self._statements.move_to_end(key)
+                self.hits += 1
+                return statement
+            self.misses += 1
+
+        statement = builder()
+        with self._lock:
+            self._statements[key] = statement
+            if len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+        return statement
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._statements),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+statement_cache = StatementCache()
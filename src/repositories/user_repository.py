@@ -1,28 +1,108 @@
+import uuid
+from datetime import timedelta
+from typing import Optional
+
 from pydantic import UUID4
-from sqlalchemy import delete
+from sqlalchemy import bindparam, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db import User, UserSession
+from db.models.user import utcnow
 from repositories.base_repository import BaseRepository
+from repositories.enums import LockMode
 
 
 class UserRepository(BaseRepository):
-    def __init__(self, session: AsyncSession):
-        super().__init__(User, session)
+    def __init__(self, session: AsyncSession, autocommit: bool = True, cache_ttl: Optional[float] = None):
+        super().__init__(User, session, autocommit, cache_ttl)
 
-    async def get_by_username(self, username: str):
-        return await self.get(filters=[self.model.username == username])
+    async def get_by_username(self, username: str, lock: Optional[LockMode] = None):
+        lock = LockMode(lock or self.lock_mode)
+        query = self._cached_statement(
+            ("get_by_username", lock),
+            lambda: self._with_lock(
+                select(self.model).where(self.model.username == bindparam("username")), lock
+            ),
+        )
+        return self._one_or_none(await self._fetch_all(query, {"username": username}, lock))
 
 
 class UserSessionRepository(BaseRepository):
-    def __init__(self, session: AsyncSession):
-        super().__init__(UserSession, session)
+    def __init__(self, session: AsyncSession, autocommit: bool = True, cache_ttl: Optional[float] = None):
+        super().__init__(UserSession, session, autocommit, cache_ttl)
+
+    async def get_session_by_token(
+        self,
+        token: UUID4 | str,
+        lock: Optional[LockMode] = None,
+        max_age: Optional[float] = None,
+    ):
+        """
+        Return the session for 'token'. With 'max_age' (seconds) sessions created longer ago are treated as missing.
+        """
+        token = _as_uuid(token)
+        lock = LockMode(lock or self.lock_mode)
+        expiring = max_age is not None
+
+        def build():
+            query = select(self.model).where(self.model.token == bindparam("token"))
+            if expiring:
+                query = query.where(self.model.created_at > bindparam("cutoff"))
+            return self._with_lock(query, lock)
+
+        query = self._cached_statement(("get_session_by_token", lock, expiring), build)
+        params = {"token": token}
+        if expiring:
+            params["cutoff"] = utcnow() - timedelta(seconds=max_age)
+        result = await self.session.execute(query, params)
+        return result.scalar_one_or_none()
 
+    async def renew(self, token: UUID4 | str, older_than: float = 0) -> bool:
+        """
+        Restart the expiry of the session for 'token' by moving its created_at to now.
+        Sessions renewed less than 'older_than' seconds ago are left alone, so a busy session is not written on every
+        request. Returns True if the session was renewed.
+        """
+        query = self._cached_statement(
+            "renew",
+            lambda: update(self.model)
+            .where(
+                # "token" is reserved for the column's own parameter in UPDATE statements.
+                self.model.token == bindparam("b_token"),
+                self.model.created_at <= bindparam("cutoff"),
+            )
+            .values(created_at=bindparam("now")),
+        )
+        now = utcnow()
+        result = await self.session.execute(
+            query,
+            {"b_token": _as_uuid(token), "cutoff": now - timedelta(seconds=older_than), "now": now},
+            execution_options={"synchronize_session": False},
+        )
+        await self._commit()
+        return result.rowcount > 0
 
-    async def get_session_by_token(self, token: UUID4):
-        return await self.get(filters=[self.model.token == token])
+    async def purge_expired(self, max_age: float, batch_size: int = 1000, max_batches: Optional[int] = None) -> int:
+        """
+        Delete sessions created more than 'max_age' seconds ago, 'batch_size' rows per transaction.
+        Returns the number of deleted sessions.
+        """
+        return await self.delete_batched(
+            [self.model.created_at <= utcnow() - timedelta(seconds=max_age)],
+            batch_size=batch_size,
+            max_batches=max_batches,
+        )
 
-    async def delete_by_token(self, token: UUID4):
+    async def delete_by_token(self, token: UUID4 | str):
+        token = _as_uuid(token)
         query = delete(self.model).where(self.model.token == token)
         await self.session.execute(query)
-        await self.session.commit()
+        await self._commit()
+
+
+def _as_uuid(token: UUID4 | str) -> uuid.UUID:
+    """
+    Session tokens are kept as hex strings in the admin session cookie; drivers without native UUID handling need UUIDs.
+    """
+    return token if isinstance(token, uuid.UUID) else uuid.UUID(str(token))
+
@@ -0,0 +1,103 @@
+import asyncio
+import os
+
+import pytest
+
+# db.settings requires connection settings at import time; the tests use their own SQLite databases.
+for name in ("POSTGRES_HOST", "POSTGRES_NAME", "POSTGRES_USER", "POSTGRES_PASSWORD"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+os.environ.setdefault("ADMIN_SECRET_KEY", "test")
+os.environ.setdefault("DB_INSTRUMENTATION", "false")
+
+from crypto.password import PasswordHash  # noqa: E402
+from db.models.base import Base  # noqa: E402
+from db.providers import DataAsyncProvider  # noqa: E402
+from repositories.user_repository import UserRepository  # noqa: E402
+
+
+# Hashed once at a low cost; bcrypt at the column's cost would dominate the test run.
+PASSWORD = "secret"
+PASSWORD_HASH = PasswordHash.new(PASSWORD, 4)
+
+
+@pytest.fixture
+def providers():
+    """
+    Providers created for the test, disposed by `run_db`.
+    """
+    return []
+
+
+@pytest.fixture
+def provider(tmp_path, providers):
+    """
+    A provider on a fresh SQLite database with every table created.
+    """
+    provider = DataAsyncProvider(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    providers.append(provider)
+
+    async def create_tables():
+        async with provider.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        # Every test runs its own event loop; pooled connections must not outlive the loop that opened them.
+        await provider.dispose()
+
+    asyncio.run(create_tables())
+    return provider
+
+
+@pytest.fixture
+def run_db(providers):
+    """
+    Run a coroutine in a new event loop and close the providers' connections before the loop ends.
+    """
+
+    def run(coroutine):
+        async def main():
+            try:
+                return await coroutine
+            finally:
+                for provider in providers:
+                    await provider.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def lagging_replica_provider(provider, providers, tmp_path):
+    """
+    A provider on the same database as `provider`, with a replica that has the schema but none of its rows,
+    like a replica that has not caught up yet. `run_db` disposes it too.
+    """
+    lagging = DataAsyncProvider(provider.url, replica_urls=[f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"])
+
+    async def create_tables():
+        async with lagging.replica_engines[0].begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await lagging.dispose()
+
+    asyncio.run(create_tables())
+    providers.append(lagging)
+    return lagging
+
+
+@pytest.fixture
+def seed_users(provider):
+    """
+    Insert users and return their rows: `await seed_users({"username": "admin", "access_level": ...}, ...)`.
+    Missing ids are numbered from 1 in order, missing usernames are "user<id>", and every password is PASSWORD.
+    """
+
+    async def seed(*users: dict) -> list[dict]:
+        rows = [
+            {"id": number, "username": f"user{user.get('id', number)}", "password": PASSWORD_HASH, **user}
+            for number, user in enumerate(users, start=1)
+        ]
+        async with provider.async_session_manager() as session:
+            await UserRepository(session).bulk_insert(rows)
+        return rows
+
+    return seed
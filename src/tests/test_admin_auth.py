@@ -0,0 +1,78 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import helpers.admin.auth as auth
+from crypto.password import PasswordHash
+from helpers.admin.enums import AccessLevel
+from helpers.admin.session_cache import session_cache
+from repositories.user_repository import UserRepository
+from tests.conftest import PASSWORD
+
+ADMIN = {"username": "admin", "access_level": AccessLevel.administrator}
+
+
+class _Request:
+    def __init__(self, form: dict):
+        self.session = {}
+        self._form = form
+
+    async def form(self):
+        return self._form
+
+
+def test_login_verifies_password_without_holding_a_connection(provider, run_db, seed_users, monkeypatch):
+    monkeypatch.setattr(auth, "db_conn", provider)
+    checked_out = []
+    averify = PasswordHash.averify
+
+    async def recording_averify(self, password):
+        checked_out.append(provider.engine.pool.checkedout())
+        return await averify(self, password)
+
+    monkeypatch.setattr(PasswordHash, "averify", recording_averify)
+
+    async def run():
+        await seed_users(ADMIN)
+        assert await auth.AdminAuth(secret_key="test").login(_Request({"username": "admin", "password": PASSWORD}))
+        assert checked_out == [0]
+
+    run_db(run())
+
+
+def test_logout_ends_cached_session(provider, run_db, seed_users, monkeypatch):
+    monkeypatch.setattr(auth, "db_conn", provider)
+
+    async def run():
+        await seed_users(ADMIN)
+        backend = auth.AdminAuth(secret_key="test")
+        request = _Request({"username": "admin", "password": PASSWORD})
+        assert await backend.login(request)
+        assert await backend.authenticate(request)
+
+        session = dict(request.session)
+        await backend.logout(request)
+        request.session = session
+        assert not await backend.authenticate(request)
+
+    run_db(run())
+
+
+def test_authenticate_right_after_login_ignores_a_lagging_replica(lagging_replica_provider, run_db, seed_users,
+                                                                  monkeypatch):
+    monkeypatch.setattr(auth, "db_conn", lagging_replica_provider)
+
+    async def run():
+        # The replica has the user, but not the session login is about to create.
+        rows = await seed_users(ADMIN)
+        async with AsyncSession(lagging_replica_provider.replica_engines[0]) as session:
+            await UserRepository(session).bulk_insert(rows)
+
+        backend = auth.AdminAuth(secret_key="test")
+        request = _Request({"username": "admin", "password": PASSWORD})
+        assert await backend.login(request)
+        assert await backend.authenticate(request)
+
+        # Without the cache entry login leaves, the lookup goes to the primary, not the empty replica.
+        session_cache.clear()
+        assert await backend.authenticate(request)
+
+    run_db(run())
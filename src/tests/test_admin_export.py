@@ -0,0 +1,33 @@
+from fastapi import FastAPI
+from sqladmin import Admin
+from starlette.requests import Request
+
+from apps.users.admin import UserAdmin
+from db.models.user import User
+
+
+class FirstUsersAdmin(UserAdmin):
+    name = "first users"
+    identity = "first-users"
+
+    def list_query(self, request: Request):
+        return super().list_query(request).where(User.id < 4)
+
+
+def _request() -> Request:
+    return Request({"type": "http", "query_string": b"", "path_params": {}, "headers": [], "session": {}})
+
+
+def test_streaming_export_uses_list_query(provider, run_db, seed_users):
+    async def run():
+        await seed_users(*({"id": i} for i in range(10, 0, -1)))
+        admin = Admin(FastAPI(), engine=provider.engine)
+        admin.add_view(FirstUsersAdmin)
+        view = admin.views[0]
+
+        request = _request()
+        response = await view.export_data(await view.get_model_objects(request), "csv", request)
+        body = "".join([chunk async for chunk in response.body_iterator])
+        assert body.splitlines() == ["id,username,access_level", "1,user1,", "2,user2,", "3,user3,"]
+
+    run_db(run())
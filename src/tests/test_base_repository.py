@@ -0,0 +1,218 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.user import User, UserSession
+from helpers.admin.enums import AccessLevel
+from repositories.user_repository import UserRepository, UserSessionRepository
+from tests.conftest import PASSWORD, PASSWORD_HASH
+
+
+def test_bulk_upsert_keeps_columns_a_row_does_not_supply(provider, run_db, seed_users):
+    async def run():
+        await seed_users(
+            {"username": "admin", "access_level": AccessLevel.administrator},
+            {"username": "support", "access_level": AccessLevel.support},
+        )
+        async with provider.async_session_manager() as session:
+            await UserRepository(session).bulk_upsert(
+                [
+                    {"id": 1, "username": "admin", "password": PASSWORD_HASH},
+                    {"id": 2, "username": "support", "password": PASSWORD_HASH, "access_level": AccessLevel.user},
+                    {"id": 3, "username": "new", "password": PASSWORD_HASH},
+                ],
+                ["id"],
+            )
+
+        async with provider.async_session_manager() as session:
+            users = {user.username: user for user in await UserRepository(session).get_all()}
+            assert users["admin"].access_level == AccessLevel.administrator
+            assert users["support"].access_level == AccessLevel.user
+            assert users["new"].access_level is None
+
+    run_db(run())
+
+
+def test_create_and_update_on_a_session_that_expires_on_commit(provider, run_db, seed_users):
+    async def run():
+        await seed_users({"username": "admin"})
+        async with AsyncSession(provider.engine) as session:
+            user_session = await UserSessionRepository(session).create(UserSession(user_id=1))
+            assert user_session.user_id == 1
+            assert user_session.created_at is not None
+
+            user = await UserRepository(session).update(1, username="root")
+            assert user.username == "root"
+            assert user.access_level is None
+
+    run_db(run())
+
+
+def test_stream_yields_every_record_in_batches(provider, run_db, seed_users):
+    async def run():
+        await seed_users(*({} for _ in range(7)))
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            batches = [batch async for batch in repository.stream(order_by=User.id, batch_size=3, batches=True)]
+            assert [[user.id for user in batch] for batch in batches] == [[1, 2, 3], [4, 5, 6], [7]]
+
+            users = [user.id async for user in repository.stream(filters=[User.id > 4], order_by=User.id.desc())]
+            assert users == [7, 6, 5]
+
+    run_db(run())
+
+
+def test_bulk_insert_accepts_dicts_tuples_and_instances_in_chunks(provider, run_db):
+    async def run():
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            pks = await repository.bulk_insert(
+                [
+                    {"id": 3, "username": "dict", "password": PASSWORD_HASH},
+                    User(id=1, username="instance", password=PASSWORD_HASH),
+                    {"id": 2, "username": "other", "password": PASSWORD_HASH},
+                ],
+                chunk_size=2,
+                returning=True,
+            )
+            assert pks == [3, 1, 2]
+            columns = ["id", "username", "password"]
+            assert await repository.bulk_insert([(4, "tuple", PASSWORD_HASH)], columns=columns) == 1
+            with pytest.raises(ValueError):
+                await repository.bulk_insert([(5, "tuple", PASSWORD_HASH)])
+
+        async with provider.async_session_manager() as session:
+            users = await UserRepository(session).get_all(order_by=User.id)
+            assert [user.username for user in users] == ["instance", "other", "dict", "tuple"]
+            # Bind processing ran for the raw rows: the stored hash still verifies.
+            assert users[3].verify_password(PASSWORD)
+
+    run_db(run())
+
+
+def test_bulk_insert_with_copy_falls_back_to_insert_off_asyncpg(provider, run_db, seed_users):
+    async def run():
+        await seed_users({"username": "admin"})
+        async with provider.async_session_manager() as session:
+            sessions = UserSessionRepository(session)
+            assert await sessions.bulk_insert([{"user_id": 1}, {"user_id": 1}], use_copy=True) == 2
+            assert await sessions.count() == 2
+
+    run_db(run())
+
+
+def test_bulk_insert_with_copy_fills_python_defaults_on_asyncpg():
+    copy = AsyncMock()
+    raw_connection = SimpleNamespace(driver_connection=SimpleNamespace(copy_records_to_table=copy))
+    connection = SimpleNamespace(get_raw_connection=AsyncMock(return_value=raw_connection))
+    session = SimpleNamespace(
+        bind=SimpleNamespace(dialect=postgresql.asyncpg.dialect()),
+        connection=AsyncMock(return_value=connection),
+        execute=AsyncMock(),
+        commit=AsyncMock(),
+        info={},
+    )
+
+    repository = UserSessionRepository(session)
+    inserted = asyncio.run(repository.bulk_insert([{"user_id": 1}] * 3, use_copy=True, chunk_size=2))
+
+    assert inserted == 3
+    session.execute.assert_not_called()
+    assert [call.kwargs["columns"] for call in copy.call_args_list] == [["user_id", "token", "created_at"]] * 2
+    records = [record for call in copy.call_args_list for record in call.kwargs["records"]]
+    assert len({record[1] for record in records}) == 3
+    assert all(record[0] == 1 and record[2] is not None for record in records)
+
+
+def test_update_and_delete_where_return_the_affected_records(provider, run_db, seed_users):
+    async def run():
+        await seed_users(*({"access_level": AccessLevel.user} for _ in range(4)))
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            loaded = await repository.get(1)
+
+            updated = await repository.update_where(
+                [User.id <= 2], {"access_level": AccessLevel.support}, returning=True
+            )
+            assert sorted(user.id for user in updated) == [1, 2]
+            assert all(user.access_level == AccessLevel.support for user in updated)
+            # Instances already in the session are synchronized with the UPDATE.
+            assert loaded.access_level == AccessLevel.support
+            assert await repository.update_where([User.id == 3], {"access_level": AccessLevel.moderator}) == 1
+
+            deleted = await repository.delete_where([User.access_level == AccessLevel.support], returning=True)
+            assert sorted(user.id for user in deleted) == [1, 2]
+            assert await repository.delete_where([User.id > 3]) == 1
+            with pytest.raises(ValueError):
+                await repository.update_where([], {"access_level": None})
+            with pytest.raises(ValueError):
+                await repository.delete_where([])
+
+        async with provider.async_session_manager() as session:
+            users = await UserRepository(session).get_all()
+            assert [(user.id, user.access_level) for user in users] == [(3, AccessLevel.moderator)]
+
+    run_db(run())
+
+
+def test_get_page_returns_the_total_with_the_page(provider, run_db, seed_users):
+    async def run():
+        await seed_users(*({"access_level": AccessLevel.support if i % 2 else None} for i in range(7)))
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            page = await repository.get_page(limit=3, offset=3, order_by=User.id)
+            assert ([user.id for user in page.items], page.total, page.limit, page.offset) == ([4, 5, 6], 7, 3, 3)
+
+            page = await repository.get_page(filters=[User.access_level.is_not(None)], limit=2, order_by=User.id)
+            assert ([user.id for user in page.items], page.total) == ([2, 4], 3)
+
+            # Past the end there is no row to carry the window count, so it is counted separately.
+            page = await repository.get_page(limit=3, offset=9)
+            assert (page.items, page.total) == ([], 7)
+            page = await repository.get_page(filters=[User.id > 100])
+            assert (page.items, page.total) == ([], 0)
+
+    run_db(run())
+
+
+def _postgresql_session(*scalars):
+    """
+    A session on PostgreSQL whose statements return 'scalars' in turn.
+    """
+    results = [SimpleNamespace(scalar=lambda value=value: value) for value in scalars]
+    return SimpleNamespace(
+        bind=SimpleNamespace(dialect=postgresql.asyncpg.dialect()),
+        execute=AsyncMock(side_effect=results),
+        info={},
+    )
+
+
+def test_approximate_count_uses_postgresql_estimates_for_large_tables():
+    def count(session, **kwargs):
+        return asyncio.run(UserRepository(session).count(approximate=True, **kwargs))
+
+    threshold = UserRepository.approximate_count_threshold
+    session = _postgresql_session(threshold * 5)
+    assert count(session) == threshold * 5
+    assert "reltuples" in str(session.execute.call_args.args[0])
+
+    session = _postgresql_session('[{"Plan": {"Plan Rows": %d}}]' % (threshold * 2))
+    assert count(session, filters=[User.access_level == AccessLevel.support]) == threshold * 2
+    assert str(session.execute.call_args.args[0].compile(dialect=postgresql.asyncpg.dialect())).startswith("EXPLAIN")
+
+    # Small or never analyzed tables are counted exactly.
+    assert count(_postgresql_session(threshold - 1, 42)) == 42
+    assert count(_postgresql_session(-1, 42)) == 42
+
+
+def test_approximate_count_is_exact_off_postgresql(provider, run_db, seed_users):
+    async def run():
+        await seed_users({}, {})
+        async with provider.async_session_manager() as session:
+            assert await UserRepository(session).count(approximate=True) == 2
+
+    run_db(run())
@@ -0,0 +1,34 @@
+import pytest
+
+from core.db_config import DataBaseSettings
+
+
+def _settings(**values) -> DataBaseSettings:
+    return DataBaseSettings(**{"DB_POOL_SIZE": 5, "DB_MAX_OVERFLOW": 10, **values})
+
+
+@pytest.mark.parametrize(
+    "budget, workers, limits",
+    [
+        (0, 8, (5, 10)),
+        (60, 4, (5, 10)),
+        (40, 4, (5, 5)),
+        (12, 4, (3, 0)),
+        (2, 4, (1, 0)),
+    ],
+)
+def test_pool_limits_fit_each_workers_share_of_the_budget(budget, workers, limits):
+    settings = _settings(DB_CONNECTION_BUDGET=budget, WEB_CONCURRENCY=workers)
+    assert settings.pool_limits == limits
+    pool_size, max_overflow = limits
+    assert settings.engine_options["pool_size"] == pool_size
+    assert settings.engine_options["max_overflow"] == max_overflow
+    if budget:
+        assert workers * sum(limits) <= max(budget, workers)
+
+
+def test_pgbouncer_disables_the_client_side_pool():
+    options = _settings(DB_PGBOUNCER=True, DB_CONNECTION_BUDGET=10).engine_options
+    assert options["poolclass"].__name__ == "NullPool"
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
@@ -0,0 +1,76 @@
+import importlib
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from db.models.user import User
+from helpers.admin.enums import AccessLevel
+from repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def import_users(provider, monkeypatch):
+    """
+    The import script's module, writing to the test database and hashing at a low cost.
+    """
+    # The script parses its arguments when imported.
+    monkeypatch.setattr(sys, "argv", ["import_users.py", "unused.csv"])
+    module = importlib.import_module("apps.users.scripts.import_users")
+    monkeypatch.setattr(module, "db_conn", provider)
+    monkeypatch.setattr(User.password.type, "rounds", 4)
+    return module
+
+
+def _write_users(path, count: int):
+    lines = ["username,password,access_level"]
+    for number in range(1, count + 1):
+        lines.append(f"user{number},secret{number},support")
+        if number == 3:
+            lines.append(",missing-username,")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_interrupted_import_resumes_after_the_last_committed_batch(
+    provider, run_db, import_users, tmp_path, monkeypatch
+):
+    source = tmp_path / "users.csv"
+    _write_users(source, 10)
+    checkpoint, errors = tmp_path / "users.checkpoint", tmp_path / "errors.jsonl"
+    write_batch = import_users.Importer.write_batch
+    written = []
+
+    async def write_two_batches(self, batch):
+        if len(written) == 2:
+            raise ConnectionError("connection lost")
+        written.append([user["username"] for _, user in batch])
+        await write_batch(self, batch)
+
+    async def run():
+        with ThreadPoolExecutor(2) as executor:
+            monkeypatch.setattr(import_users.Importer, "write_batch", write_two_batches)
+            importer = import_users.Importer(executor, checkpoint, errors)
+            with pytest.raises(ConnectionError):
+                await importer.run(import_users.read_rows(source, "csv"), 3, importer.load_checkpoint())
+            assert written == [["user1", "user2", "user3"], ["user4", "user5", "user6"]]
+            # Line 8 is user6; user7 and later were in the batch that failed.
+            assert json.loads(checkpoint.read_text()) == {"line": 8, "imported": 6, "failed": 1}
+
+            monkeypatch.setattr(import_users.Importer, "write_batch", write_batch)
+            importer = import_users.Importer(executor, checkpoint, errors)
+            resume_after = importer.load_checkpoint()
+            await importer.run(import_users.read_rows(source, "csv"), 3, resume_after)
+            assert (resume_after, importer.imported, importer.failed) == (8, 10, 1)
+
+        async with provider.async_session_manager() as session:
+            users = await UserRepository(session).get_all(limit=100)
+            assert {user.username for user in users} == {f"user{number}" for number in range(1, 11)}
+            assert all(user.access_level == AccessLevel.support for user in users)
+            assert all(user.verify_password(f"secret{user.username[4:]}") for user in users)
+
+        # The bad row is reported once, not again by the resumed run.
+        report = [json.loads(line) for line in errors.read_text().splitlines()]
+        assert report == [{"line": 5, "username": "", "error": "username is required"}]
+
+    run_db(run())
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from db.instrumentation import QueryInstrumentation, _calling_repository
+from repositories.user_repository import UserRepository
+
+
+def test_statements_are_attributed_to_public_repository_methods(provider, run_db, seed_users):
+    callers = []
+
+    def record_caller(*args):
+        callers.append(_calling_repository())
+
+    async def run():
+        await seed_users({"username": "admin"})
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            event.listen(provider.engine.sync_engine, "before_cursor_execute", record_caller)
+            await repository.get(1)
+            await repository.get_by_username("admin")
+            await repository.get_all()
+
+    run_db(run())
+    assert callers == ["UserRepository.get", "UserRepository.get_by_username", "UserRepository.get_all"]
+
+
+def test_failed_statement_leaves_no_start_time_on_the_connection(provider, run_db):
+    QueryInstrumentation().install(provider.engine)
+
+    async def run():
+        async with provider.engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                await connection.execute(text("SELECT * FROM missing_table"))
+            raw = await connection.get_raw_connection()
+            assert "query_started_at" not in raw.info
+            await connection.execute(text("SELECT 1"))
+            assert raw.info["query_started_at"] == []
+
+    run_db(run())
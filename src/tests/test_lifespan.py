@@ -0,0 +1,21 @@
+import apps.lifespan
+from apps.main import create_app
+from repositories.statement_cache import statement_cache
+
+
+def test_lifespan_warms_up_the_pool_and_statements_then_closes_connections(provider, run_db, monkeypatch):
+    monkeypatch.setattr(apps.lifespan, "db_conn", provider)
+    monkeypatch.setattr(apps.lifespan, "ADMIN_SESSION_PURGE_INTERVAL", 0)
+    app = create_app()
+    assert {"started", "imports", "modules", "build"} <= set(app.state.startup)
+
+    async def run():
+        statement_cache.clear()
+        async with app.router.lifespan_context(app):
+            # The warm-up connections are back in the pool, ready for the first requests.
+            assert provider.engine.pool.checkedin() == 2
+            assert provider.engine.pool.checkedout() == 0
+            assert statement_cache.stats()["size"] == 4
+        assert provider.engine.pool.checkedin() == 0
+
+    run_db(run())
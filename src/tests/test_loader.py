@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from repositories.user_repository import UserRepository
+
+
+def _count_statements(provider) -> list[str]:
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(provider.engine.sync_engine, "before_cursor_execute", record)
+    return statements
+
+
+def test_get_many_keeps_the_requested_order_in_chunks(provider, run_db, seed_users):
+    async def run():
+        await seed_users(*({} for _ in range(5)))
+        statements = _count_statements(provider)
+        async with provider.async_session_manager() as session:
+            users = await UserRepository(session).get_many([4, 9, 1, 4, 2, 5, 3], chunk_size=2)
+        assert [user.id if user else None for user in users] == [4, None, 1, 4, 2, 5, 3]
+        # Six distinct IDs, two per statement; the duplicate 4 is fetched once.
+        assert len(statements) == 3
+
+    run_db(run())
+
+
+def test_loader_coalesces_concurrent_loads_into_one_query(provider, run_db, seed_users):
+    async def run():
+        await seed_users(*({} for _ in range(3)))
+        statements = _count_statements(provider)
+        async with provider.async_session_manager() as session:
+            loader = UserRepository(session).loader()
+            users = await asyncio.gather(loader.load(3), loader.load(1), loader.load(3), loader.load(7))
+            assert [user.id if user else None for user in users] == [3, 1, 3, None]
+            assert users[0] is users[2]
+            assert loader.batches == 1 and len(statements) == 1
+
+            assert [user.id for user in await loader.load_many([2, 1])] == [2, 1]
+            assert loader.batches == 2 and len(statements) == 2
+
+    run_db(run())
+
+
+def test_loader_fails_every_caller_of_a_failed_batch(provider, run_db):
+    async def run():
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            loader = repository.loader()
+
+            async def broken_get_many(pks, chunk_size):
+                raise RuntimeError("database unavailable")
+
+            repository.get_many = broken_get_many
+            results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+            assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+            with pytest.raises(RuntimeError):
+                await loader.load(3)
+
+    run_db(run())
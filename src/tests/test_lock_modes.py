@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from db.models.user import User
+from repositories.enums import LockMode
+from repositories.user_repository import UserRepository
+
+
+def _recording_session():
+    result = Mock()
+    result.scalars.return_value.all.return_value = []
+    return SimpleNamespace(execute=AsyncMock(return_value=result), info={})
+
+
+def _executed_sql(session) -> str:
+    statement = session.execute.call_args.args[0]
+    return str(statement.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+@pytest.mark.parametrize(
+    "lock, clause",
+    [
+        (LockMode.none, None),
+        (LockMode.update, "FOR UPDATE"),
+        (LockMode.share, "FOR SHARE"),
+        (LockMode.nowait, "FOR UPDATE NOWAIT"),
+        (LockMode.skip_locked, "FOR UPDATE SKIP LOCKED"),
+        ("share", "FOR SHARE"),
+    ],
+)
+def test_get_locks_rows_per_lock_mode(lock, clause):
+    for call in (
+        lambda repository: repository.get(1, lock=lock),
+        lambda repository: repository.get(filters=[User.username == "admin"], lock=lock),
+        lambda repository: repository.get_by_username("admin", lock=lock),
+    ):
+        session = _recording_session()
+        asyncio.run(call(UserRepository(session)))
+        sql = _executed_sql(session)
+        if clause is None:
+            assert "FOR " not in sql
+        else:
+            assert sql.endswith(clause)
+
+
+def test_repository_lock_mode_is_the_default():
+    class LockingUserRepository(UserRepository):
+        lock_mode = LockMode.share
+
+    session = _recording_session()
+    asyncio.run(LockingUserRepository(session).get(1))
+    assert _executed_sql(session).endswith("FOR SHARE")
+    asyncio.run(LockingUserRepository(session).get(1, lock=LockMode.nowait))
+    assert _executed_sql(session).endswith("FOR UPDATE NOWAIT")
+
+
+def test_locked_rows_are_read_on_sqlite(provider, run_db, seed_users):
+    async def run():
+        await seed_users({"username": "admin"})
+        async with provider.async_session_manager() as session:
+            # SQLite has no row locks; the statement runs without the clause.
+            assert (await UserRepository(session).get(1, lock=LockMode.update)).username == "admin"
+
+    run_db(run())
@@ -0,0 +1,128 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from db.models.user import User, UserSession
+from helpers.admin.enums import AccessLevel
+from repositories.pagination import decode_cursor, encode_cursor, keyset_order_by, split_order_by
+from repositories.user_repository import UserRepository, UserSessionRepository
+
+
+LEVELS = [AccessLevel.user, AccessLevel.support, None, AccessLevel.administrator, AccessLevel.moderator]
+
+
+async def _seed_levels(seed_users):
+    return await seed_users(*({"username": f"user{i:02d}", "access_level": LEVELS[i % 5]} for i in range(25)))
+
+
+def _expected_order(order_by):
+    """
+    The full ordering keyset pagination promises: NULLs last ascending and first descending, then the primary key.
+    """
+    return keyset_order_by(split_order_by(order_by) + [(User.id, False)])
+
+
+async def _pages(repository, order_by, limit=4, cursors=True):
+    """
+    Follow next cursors (or keys) from the first page to the last and return every item and the pages.
+    """
+    pages = [await repository.get_all_keyset(order_by=order_by, limit=limit)]
+    while pages[-1].has_next:
+        if cursors:
+            page = await repository.get_all_keyset(order_by=order_by, cursor=pages[-1].next_cursor, limit=limit)
+        else:
+            page = await repository.get_all_keyset(order_by=order_by, after=pages[-1].next_key, limit=limit)
+        pages.append(page)
+    return [item for page in pages for item in page.items], pages
+
+
+@pytest.mark.parametrize(
+    "order_by",
+    [
+        [User.username],
+        [User.username.desc()],
+        [User.access_level, User.username],
+        [User.access_level.desc(), User.username.desc()],
+        [User.access_level.desc(), User.username],
+        [User.access_level, User.username.desc()],
+    ],
+    ids=["asc", "desc", "nullable-asc", "nullable-desc", "mixed-desc-asc", "mixed-asc-desc"],
+)
+def test_keyset_pages_return_every_row_once_in_order(provider, run_db, seed_users, order_by):
+    async def run():
+        await _seed_levels(seed_users)
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            expected = await repository.get_all(order_by=_expected_order(order_by), limit=100)
+            assert len(expected) == 25
+            for cursors in (True, False):
+                items, pages = await _pages(repository, order_by, cursors=cursors)
+                assert [user.id for user in items] == [user.id for user in expected]
+                assert len(pages) == 7
+
+    run_db(run())
+
+
+@pytest.mark.parametrize(
+    "order_by",
+    [[User.username], [User.access_level.desc(), User.username], [User.access_level, User.username.desc()]],
+    ids=["asc", "mixed-desc-asc", "mixed-asc-desc"],
+)
+def test_keyset_before_walks_back_to_the_first_page(provider, run_db, seed_users, order_by):
+    async def run():
+        await _seed_levels(seed_users)
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            forward, pages = await _pages(repository, order_by)
+
+            backward = []
+            page = pages[-1]
+            backward[:0] = page.items
+            while page.has_prev:
+                page = await repository.get_all_keyset(order_by=order_by, before_cursor=page.prev_cursor, limit=4)
+                backward[:0] = page.items
+                assert page.has_next
+            assert [user.id for user in backward] == [user.id for user in forward]
+
+            # A page read backward matches the same page read forward.
+            back = await repository.get_all_keyset(order_by=order_by, before=pages[2].prev_key, limit=4)
+            assert [user.id for user in back.items] == [user.id for user in pages[1].items]
+
+    run_db(run())
+
+
+def test_keyset_date_and_uuid_keys(provider, run_db, seed_users):
+    async def run():
+        await seed_users({})
+        started = datetime.datetime(2026, 1, 1)
+        async with provider.async_session_manager() as session:
+            sessions = UserSessionRepository(session)
+            await sessions.bulk_insert(
+                [{"token": uuid.uuid4(), "user_id": 1, "created_at": started} for _ in range(5)]
+                + [
+                    {"token": uuid.uuid4(), "user_id": 1, "created_at": started + datetime.timedelta(hours=i)}
+                    for i in range(1, 6)
+                ]
+            )
+            order_by = [UserSession.created_at.desc()]
+            expected = await sessions.get_all(order_by=order_by + [UserSession.token], limit=100)
+            items, _ = await _pages(sessions, order_by, limit=3)
+            assert [s.token for s in items] == [s.token for s in expected]
+
+    run_db(run())
+
+
+def test_cursor_round_trips_key_types():
+    key = (AccessLevel.moderator, datetime.date(2026, 1, 2), datetime.datetime(2026, 1, 2, 3), uuid.UUID(int=5), None)
+    assert decode_cursor(encode_cursor(key)) == ("moderator", *key[1:])
+
+
+def test_keyset_rejects_two_bounds(provider, run_db):
+    async def run():
+        async with provider.async_session_manager() as session:
+            with pytest.raises(ValueError):
+                await UserRepository(session).get_all_keyset(order_by=[User.id], after=(1,), before=(5,))
+
+    run_db(run())
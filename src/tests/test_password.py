@@ -0,0 +1,16 @@
+import asyncio
+
+from crypto.password import PasswordHash
+from db.models.user import User
+
+
+def test_anew_without_rounds_uses_bcrypt_default():
+    password = asyncio.run(PasswordHash.anew("secret"))
+    assert password.verify("secret")
+
+
+def test_anew_with_column_rounds():
+    rounds = User.password.type.rounds
+    password = asyncio.run(PasswordHash.anew("secret", rounds))
+    assert password.hash.startswith(f"$2b${rounds:02d}$")
+    assert password.rounds == rounds
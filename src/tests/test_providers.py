@@ -0,0 +1,149 @@
+import asyncio
+from contextlib import suppress
+
+import pytest
+
+from db.models.base import Base
+from db.pool import InstrumentedAsyncQueuePool
+from db.providers import DataAsyncProvider
+from repositories.user_repository import UserRepository
+
+
+def _provider_with_unreachable_replica(tmp_path) -> DataAsyncProvider:
+    provider = DataAsyncProvider(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+    )
+
+    async def create_tables():
+        async with provider.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await provider.dispose()
+
+    asyncio.run(create_tables())
+    return provider
+
+
+def test_failed_replica_stops_receiving_reads(tmp_path):
+    provider = _provider_with_unreachable_replica(tmp_path)
+
+    async def run():
+        async with provider.async_session_manager() as session:
+            try:
+                await UserRepository(session).get(1)
+            except Exception:
+                pass
+        assert provider.pick_replica() is None
+        async with provider.async_session_manager() as session:
+            assert await UserRepository(session).get(1) is None
+        await provider.dispose()
+
+    asyncio.run(run())
+
+
+def test_health_checks_drop_unreachable_replica(tmp_path):
+    provider = _provider_with_unreachable_replica(tmp_path)
+
+    async def run():
+        assert provider.pick_replica() is not None
+        checks = asyncio.create_task(provider.run_replica_health_checks(interval=60))
+        while provider.pick_replica() is not None:
+            await asyncio.sleep(0.01)
+        # Cancelled while it sleeps; cancelling a connection attempt would leave the driver's thread running
+        # past the end of the event loop.
+        checks.cancel()
+        with suppress(asyncio.CancelledError):
+            await checks
+        await provider.dispose()
+
+    asyncio.run(run())
+
+
+def test_unit_of_work_reads_from_the_primary(lagging_replica_provider, run_db, seed_users):
+    provider = lagging_replica_provider
+
+    async def run():
+        await seed_users({"username": "admin"})
+        async with provider.async_session_manager() as session:
+            assert await UserRepository(session).get_by_username("admin") is None
+        async with provider.unit_of_work() as uow:
+            assert await uow.repository(UserRepository).get_by_username("admin") is not None
+        assert await provider.run_transaction(lambda uow: uow.repository(UserRepository).get(1)) is not None
+
+    run_db(run())
+
+
+def test_in_memory_sqlite_keeps_its_default_pool():
+    provider = DataAsyncProvider("sqlite+aiosqlite://")
+
+    async def run():
+        async with provider.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        # With a queue pool this would be a new connection to a new, empty in-memory database.
+        async with provider.async_session_manager() as session:
+            assert await UserRepository(session).count() == 0
+        await provider.dispose()
+
+    asyncio.run(run())
+    assert not isinstance(provider.engine.pool, InstrumentedAsyncQueuePool)
+    assert set(provider.pool_stats()) == {"status"}
+
+
+def test_file_database_uses_the_instrumented_pool(provider):
+    assert isinstance(provider.engine.pool, InstrumentedAsyncQueuePool)
+    assert "checkouts" in provider.pool_stats()
+
+
+def test_gather_returns_results_in_call_order(provider, run_db, seed_users):
+    async def run():
+        await seed_users({"username": "admin"}, {"username": "support"})
+        user, users, total = await provider.gather(
+            lambda session: UserRepository(session).get(2),
+            lambda session: UserRepository(session).get_all(),
+            lambda session: UserRepository(session).count(),
+        )
+        assert user.username == "support"
+        assert [user.username for user in users] == ["admin", "support"]
+        assert total == 2
+
+    run_db(run())
+
+
+def test_gather_limits_concurrent_sessions(provider, run_db):
+    running = []
+    peak = []
+
+    async def call(session):
+        running.append(session)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(session)
+        return len(peak)
+
+    async def run():
+        assert len(await provider.gather(*[call] * 7, limit=3)) == 7
+        assert max(peak) == 3
+
+    run_db(run())
+
+
+def test_gather_cancels_the_other_calls_when_one_fails(provider, run_db):
+    cancelled = []
+
+    async def slow(session):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing(session):
+        await asyncio.sleep(0.01)
+        raise LookupError("not found")
+
+    async def run():
+        with pytest.raises(LookupError):
+            await provider.gather(slow, failing, slow)
+        assert cancelled == [True, True]
+
+    run_db(run())
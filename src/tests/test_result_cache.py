@@ -0,0 +1,44 @@
+from sqlalchemy import inspect
+
+from repositories.result_cache import result_cache
+from repositories.user_repository import UserRepository
+
+
+def _detached(instance) -> bool:
+    return inspect(instance).detached
+
+
+def test_repository_reads_bypass_cache_by_default(provider, run_db, seed_users):
+    async def run():
+        await seed_users({"username": "admin"})
+        async with provider.async_session_manager() as session:
+            user = await UserRepository(session).get(1)
+            assert not _detached(user)
+            user.username = "renamed"
+            await session.commit()
+
+        async with provider.async_session_manager() as session:
+            assert (await UserRepository(session).get(1)).username == "renamed"
+
+    run_db(run())
+
+
+def test_cached_reads_are_detached_and_invalidated_on_commit(provider, run_db, seed_users):
+    result_cache.clear()
+
+    async def run():
+        await seed_users({"username": "admin"})
+
+        async with provider.async_session_manager() as session:
+            cached = UserRepository(session, cache_ttl=60)
+            hits = result_cache.hits
+            miss = await cached.get_by_username("admin")
+            hit = await cached.get_by_username("admin")
+            assert result_cache.hits == hits + 1
+            assert miss is not hit and _detached(miss) and _detached(hit)
+
+            await UserRepository(session).update(1, username="renamed")
+            assert await cached.get_by_username("admin") is None
+            assert (await cached.get(1)).username == "renamed"
+
+    run_db(run())
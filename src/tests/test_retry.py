@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+import db.retry
+from db.models.user import UserSession
+from db.retry import RetryBudget, RetryPolicy, retry_stats, run_with_retry, transient_sqlstate
+from repositories.user_repository import UserSessionRepository
+
+NO_DELAY = RetryPolicy(attempts=3, base_delay=0, max_delay=0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget(monkeypatch):
+    # The process-wide budget would carry the retries of one test into the next.
+    monkeypatch.setattr(db.retry, "retry_budget", RetryBudget())
+
+
+class _DriverError(Exception):
+    def __init__(self, sqlstate=None, pgcode=None):
+        super().__init__(f"sqlstate {sqlstate or pgcode}")
+        self.sqlstate = sqlstate
+        self.pgcode = pgcode
+
+
+def _error(sqlstate: str, attribute: str = "sqlstate") -> DBAPIError:
+    return DBAPIError("UPDATE users", {}, _DriverError(**{attribute: sqlstate}))
+
+
+def _failing(*sqlstates: str):
+    """
+    A transaction that fails with each of 'sqlstates' in turn, then returns the number of attempts.
+    """
+    attempts = []
+
+    async def transaction():
+        attempts.append(None)
+        if len(attempts) <= len(sqlstates):
+            raise _error(sqlstates[len(attempts) - 1])
+        return len(attempts)
+
+    return transaction
+
+
+def test_transient_sqlstates_are_recognised_for_both_drivers():
+    assert transient_sqlstate(_error("40P01")) == "40P01"
+    assert transient_sqlstate(_error("40001", attribute="pgcode")) == "40001"
+    assert transient_sqlstate(_error("55P03")) == "55P03"
+    assert transient_sqlstate(_error("23505")) is None
+    assert transient_sqlstate(RuntimeError("40P01")) is None
+
+
+def test_transient_failures_are_retried_and_counted():
+    retry_stats.clear()
+    assert asyncio.run(run_with_retry(_failing("40P01", "40001"), name="test.retry", policy=NO_DELAY)) == 3
+    assert retry_stats.stats()["test.retry"] == {"calls": 1, "retries": 2, "40P01": 1, "40001": 1}
+
+
+def test_other_errors_and_exhausted_retries_are_raised():
+    with pytest.raises(DBAPIError) as raised:
+        asyncio.run(run_with_retry(_failing("23505"), policy=NO_DELAY))
+    assert raised.value.orig.sqlstate == "23505"
+
+    retry_stats.clear()
+    with pytest.raises(DBAPIError):
+        asyncio.run(run_with_retry(_failing(*["40P01"] * 4), name="test.exhausted", policy=NO_DELAY))
+    assert retry_stats.stats()["test.exhausted"]["exhausted"] == 1
+    assert retry_stats.stats()["test.exhausted"]["retries"] == 3
+
+
+def test_retries_stop_when_the_budget_is_spent(monkeypatch):
+    monkeypatch.setattr(db.retry, "retry_budget", RetryBudget(ratio=0, minimum=1))
+    retry_stats.clear()
+    with pytest.raises(DBAPIError):
+        asyncio.run(run_with_retry(_failing("40P01", "40P01"), name="test.budget", policy=NO_DELAY))
+    assert retry_stats.stats()["test.budget"] == {"calls": 1, "retries": 1, "40P01": 1, "budget_exhausted": 1}
+
+
+def test_run_transaction_replays_the_whole_unit_of_work(provider, run_db, seed_users):
+    attempts = []
+
+    async def create_session(uow):
+        user_session = await uow.repository(UserSessionRepository).create(UserSession(user_id=1))
+        attempts.append(user_session.token)
+        if len(attempts) == 1:
+            # The first attempt's insert is rolled back with its unit of work.
+            raise _error("40001")
+        return user_session
+
+    async def run():
+        await seed_users({"username": "admin"})
+        user_session = await provider.run_transaction(create_session, policy=NO_DELAY)
+        async with provider.async_session_manager() as session:
+            assert [s.token for s in await UserSessionRepository(session).get_all()] == [user_session.token]
+        assert len(attempts) == 2 and attempts[1] == user_session.token
+
+    run_db(run())
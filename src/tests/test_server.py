@@ -0,0 +1,20 @@
+import os
+
+import apps.server
+
+
+def test_server_runs_the_app_factory_with_the_configured_workers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(apps.server, "WEB_CONCURRENCY", 3)
+    monkeypatch.setattr(apps.server.uvicorn, "run", lambda app, **options: calls.append((app, options)))
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+
+    apps.server.main()
+
+    [(app, options)] = calls
+    assert app == "apps.main:create_app"
+    assert options["factory"] is True
+    assert options["workers"] == 3
+    assert options["timeout_graceful_shutdown"] == apps.server.WEB_SHUTDOWN_TIMEOUT
+    # Workers read the count from the environment to size their pools.
+    assert os.environ["WEB_CONCURRENCY"] == "3"
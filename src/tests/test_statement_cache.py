@@ -0,0 +1,50 @@
+from sqlalchemy import select
+
+from db.models.user import User
+from repositories.enums import LockMode
+from repositories.statement_cache import StatementCache, statement_cache
+from repositories.user_repository import UserRepository
+
+
+def test_cache_builds_once_per_key_and_evicts_least_recently_used():
+    cache = StatementCache(maxsize=2)
+    built = []
+
+    def builder(name):
+        def build():
+            built.append(name)
+            return select(User).where(User.username == name)
+
+        return build
+
+    first = cache.get("a", builder("a"))
+    assert cache.get("a", builder("a")) is first
+    cache.get("b", builder("b"))
+    cache.get("a", builder("a"))
+    cache.get("c", builder("c"))
+    cache.get("a", builder("a"))
+    cache.get("b", builder("b"))
+
+    assert built == ["a", "b", "c", "b"]
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 4}
+    cache.clear()
+    assert cache.stats()["size"] == cache.stats()["hits"] == 0
+
+
+def test_repository_reads_reuse_statements_across_calls_and_values(provider, run_db, seed_users):
+    async def run():
+        await seed_users({"username": "admin"}, {"username": "support"})
+        statement_cache.clear()
+        async with provider.async_session_manager() as session:
+            repository = UserRepository(session)
+            assert (await repository.get(1)).username == "admin"
+            assert (await repository.get(2)).username == "support"
+            assert (await repository.get_by_username("support")).id == 2
+            assert await repository.get_by_username("nobody") is None
+            # A different lock mode is a different statement.
+            assert (await repository.get(1, lock=LockMode.update)).id == 1
+
+        assert statement_cache.stats()["misses"] == 3
+        assert statement_cache.stats()["hits"] == 2
+
+    run_db(run())
@@ -0,0 +1,92 @@
+import asyncio
+import datetime
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from sqlalchemy.dialects import postgresql
+
+from db.models.user import UserSession, utcnow
+from repositories.user_repository import UserSessionRepository
+
+
+HOUR = 3600
+
+
+async def _seed_sessions(provider, seed_users, *ages: float) -> list[uuid.UUID]:
+    """
+    Create one session per age in seconds and return their tokens.
+    """
+    await seed_users({"username": "admin"})
+    tokens = [uuid.uuid4() for _ in ages]
+    async with provider.async_session_manager() as session:
+        await UserSessionRepository(session).bulk_insert(
+            [
+                {"token": token, "user_id": 1, "created_at": utcnow() - datetime.timedelta(seconds=age)}
+                for token, age in zip(tokens, ages)
+            ]
+        )
+    return tokens
+
+
+def test_expired_session_is_treated_as_missing(provider, run_db, seed_users):
+    async def run():
+        fresh, old = await _seed_sessions(provider, seed_users, 60, 2 * HOUR)
+        async with provider.async_session_manager() as session:
+            repository = UserSessionRepository(session)
+            assert await repository.get_session_by_token(fresh.hex, max_age=HOUR) is not None
+            assert await repository.get_session_by_token(old.hex, max_age=HOUR) is None
+            assert await repository.get_session_by_token(old.hex) is not None
+
+    run_db(run())
+
+
+def test_renew_restarts_expiry_of_old_sessions_only(provider, run_db, seed_users):
+    async def run():
+        fresh, old = await _seed_sessions(provider, seed_users, 60, 2 * HOUR)
+        async with provider.async_session_manager() as session:
+            repository = UserSessionRepository(session)
+            assert await repository.renew(fresh.hex, older_than=HOUR / 2) is False
+            assert await repository.renew(old.hex, older_than=HOUR / 2) is True
+            assert await repository.renew(uuid.uuid4()) is False
+            assert await repository.get_session_by_token(old, max_age=HOUR) is not None
+
+    run_db(run())
+
+
+def test_purge_expired_deletes_only_old_sessions(provider, run_db, seed_users):
+    async def run():
+        fresh, *old = await _seed_sessions(provider, seed_users, 60, 2 * HOUR, 3 * HOUR)
+        async with provider.async_session_manager() as session:
+            repository = UserSessionRepository(session)
+            assert await repository.purge_expired(HOUR, batch_size=1) == 2
+            assert [s.token for s in await repository.get_all()] == [fresh]
+
+    run_db(run())
+
+
+def test_new_session_is_not_expired(provider, run_db, seed_users):
+    async def run():
+        await seed_users({"username": "admin"})
+        async with provider.async_session_manager() as session:
+            repository = UserSessionRepository(session)
+            user_session = await repository.create(UserSession(user_id=1))
+            assert await repository.get_session_by_token(user_session.token, max_age=60) is not None
+
+    run_db(run())
+
+
+def test_renew_compiles_for_postgresql():
+    session = SimpleNamespace(
+        execute=AsyncMock(return_value=SimpleNamespace(rowcount=1)),
+        commit=AsyncMock(),
+        info={},
+    )
+    token = uuid.uuid4()
+
+    assert asyncio.run(UserSessionRepository(session).renew(token, older_than=60))
+
+    statement, params = session.execute.call_args.args
+    compiled = statement.compile(dialect=postgresql.asyncpg.dialect(), column_keys=list(params))
+    assert "user_sessions.token = $" in str(compiled)
+    assert compiled.construct_params(params)["b_token"] == token